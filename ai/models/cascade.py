@@ -0,0 +1,152 @@
+import re
+import threading
+import time
+from itertools import combinations
+
+from rapidfuzz import fuzz
+
+from ai.models.gpt import gpt_extract_content
+
+
+class CascadeStats:
+    """
+    Thread-safe counters for how often a cascade escalates and how much latency it saves.
+    Savings are estimated from the measured remote latency, so they are unknown (None) until the cascade has escalated
+    at least once.
+    """
+
+    # --- Methods ---
+    def __init__(self, expected_remote_latency: float | None = None, alpha: float = 0.3):
+        """Initialize counters, optionally with a known estimate of a remote call's latency."""
+
+        self.calls = 0
+        self.escalations = 0
+        self.local_failures = 0     # Calls escalated because the local model raised (not counted as escalations)
+        self.local_time = 0.0       # Time spent on calls answered locally
+        self.wasted_time = 0.0      # Local time spent before escalating
+        self.expected_remote_latency = expected_remote_latency
+        self.alpha = alpha
+        self._lock = threading.Lock()
+
+    def record_local(self, local_latency: float) -> None:
+        """Record a call answered by the local model alone."""
+
+        with self._lock:
+            self.calls += 1
+            self.local_time += local_latency
+
+    def record_escalation(self, local_latency: float, remote_latency: float, local_failed: bool = False) -> None:
+        """
+        Record a call that fell through to the remote model (the local attempt is wasted time), either because the
+        local answers disagreed or because the local model failed.
+        """
+
+        with self._lock:
+            self.calls += 1
+            if local_failed:
+                self.local_failures += 1
+            else:
+                self.escalations += 1
+            self.wasted_time += local_latency
+            if self.expected_remote_latency is None:
+                self.expected_remote_latency = remote_latency
+            else:
+                self.expected_remote_latency = (
+                    self.alpha * remote_latency + (1 - self.alpha) * self.expected_remote_latency
+                )
+
+    def snapshot(self) -> dict:
+        """Copy of the current counters."""
+
+        with self._lock:
+            latency_saved = None
+            if self.expected_remote_latency is not None:
+                local_calls = self.calls - self.escalations - self.local_failures
+                latency_saved = local_calls * self.expected_remote_latency - self.local_time - self.wasted_time
+
+            return {
+                "calls": self.calls,
+                "escalations": self.escalations,
+                "escalation_rate": self.escalations / self.calls if self.calls else 0.0,
+                "local_failures": self.local_failures,
+                "latency_saved": latency_saved,
+            }
+
+
+def normalize_answer(text: str) -> str:
+    """Lowercase `text` and drop punctuation and extra whitespace, so 'Yes.' and 'yes' compare equal."""
+
+    return " ".join(re.sub(r"[^\w\s]", "", text.lower()).split())
+
+
+def self_consistency(samples: list[str]) -> float:
+    """Confidence (0-1) as the mean pairwise similarity of independently sampled answers."""
+
+    normalized = [normalize_answer(s) for s in samples]
+    pairs = list(combinations(normalized, 2))
+    if not pairs:
+        return 1.0
+
+    return sum(fuzz.ratio(a, b) for a, b in pairs) / (100 * len(pairs))
+
+
+class CascadeModel:
+    """
+    Model that answers with a cheap local model first and only escalates to a remote model when unsure.
+    Confidence is scored by self-consistency: the local model is sampled several times and the answers compared.
+    """
+
+    # --- Methods ---
+    def __init__(self, name: str, local, remote, samples: int = 3, threshold: float = 0.9,
+                 expected_remote_latency: float | None = None):
+        """Initialize the cascade for node `name` with local/remote chat models and a confidence threshold."""
+
+        self.name = name
+        self.local = local
+        self.remote = remote
+        self.samples = samples
+        self.threshold = threshold
+        self.stats = CascadeStats(expected_remote_latency)
+
+    def resolve(self) -> "CascadeModel":
+        """Build the underlying local and remote model clients if they are created lazily."""
+
+        for model in (self.local, self.remote):
+            if hasattr(model, "resolve"):
+                model.resolve()
+
+        return self
+
+    def invoke(self, messages, **kwargs):
+        """Invoke the local model and return its most representative answer, escalating if confidence is low."""
+
+        # Sample the local model (remote-only kwargs such as `reasoning` are not understood by Ollama)
+        start = time.perf_counter()
+        local_failed = False
+        try:
+            results = self.local.batch([messages] * self.samples)
+        except Exception as e:
+            print(f"\n::{self.name}: local model failed ({type(e).__name__}: {e}), escalating")
+            results = []
+            local_failed = True
+        local_latency = time.perf_counter() - start
+
+        texts = [gpt_extract_content(r) for r in results]
+        if texts and self_consistency(texts) >= self.threshold:
+            self.stats.record_local(local_latency)
+            return results[self._medoid(texts)]
+
+        # Not confident (or local model unavailable): escalate to the remote model
+        start = time.perf_counter()
+        result = self.remote.invoke(messages, **kwargs)
+        self.stats.record_escalation(local_latency, time.perf_counter() - start, local_failed)
+
+        return result
+
+    @staticmethod
+    def _medoid(texts: list[str]) -> int:
+        """Index of the sample most similar to all the others (the majority answer for short outputs)."""
+
+        normalized = [normalize_answer(t) for t in texts]
+        scores = [sum(fuzz.ratio(t, other) for other in normalized) for t in normalized]
+        return scores.index(max(scores))
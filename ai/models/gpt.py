@@ -1,20 +1,31 @@
-from langchain_openai import ChatOpenAI
+from ai.models.lazy import LazyModel
+
+
+def _chat_openai(**kwargs):
+    """Build a ChatOpenAI client (langchain_openai is only imported once a model is first used)."""
+
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(**kwargs)
 
 
 # GPT 5 low temperature model
-gpt5 = ChatOpenAI(
+gpt5 = LazyModel(
+    _chat_openai,
     model="gpt-5",
     temperature=0.0
 )
 
 # GPT 5 mini low temperature model
-gpt5_mini = ChatOpenAI(
+gpt5_mini = LazyModel(
+    _chat_openai,
     model="gpt-5-mini",
     temperature=0.0
 )
 
 # GPT 5 nano low temperature model
-gpt5_nano = ChatOpenAI(
+gpt5_nano = LazyModel(
+    _chat_openai,
     model="gpt-5-nano",
     temperature=0.0
 )
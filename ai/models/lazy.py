@@ -0,0 +1,34 @@
+import threading
+
+
+class LazyModel:
+    """
+    Proxy that builds a model client on first use.
+    Keeps heavy client libraries (langchain_openai, langchain_ollama) from being imported at startup.
+    """
+
+    # --- Methods ---
+    def __init__(self, factory, **kwargs):
+        """Initialize the proxy with a factory called as `factory(**kwargs)` on first use."""
+
+        self._factory = factory
+        self._kwargs = kwargs
+        self._model = None
+        self._lock = threading.Lock()
+
+    def resolve(self):
+        """Build the underlying model if needed and return it."""
+
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = self._factory(**self._kwargs)
+
+        return self._model
+
+    def __getattr__(self, name):
+        # Only called for attributes not found on the proxy itself (invoke, batch, with_structured_output, ...)
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        return getattr(self.resolve(), name)
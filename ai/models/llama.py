@@ -1,8 +1,24 @@
-from langchain_ollama import ChatOllama
+from ai.models.lazy import LazyModel
+
+
+def _chat_ollama(**kwargs):
+    """Build a ChatOllama client (langchain_ollama is only imported once a model is first used)."""
+
+    from langchain_ollama import ChatOllama
+
+    return ChatOllama(**kwargs)
 
 
 # Create a Llama model
-llama_low_temp = ChatOllama(
+llama_low_temp = LazyModel(
+    _chat_ollama,
     model="llama3.2:3b",
     temperature=0.0
 )
+
+# Sampling Llama model (non-zero temperature so repeated samples can be compared for self-consistency)
+llama_sampling = LazyModel(
+    _chat_ollama,
+    model="llama3.2:3b",
+    temperature=0.7
+)
@@ -0,0 +1,135 @@
+import argparse
+import json
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+
+
+class OllamaStubServer:
+    """
+    Minimal stand-in for an Ollama server, for tests and load runs without a local model.
+    Serves `/api/chat` (streamed or not) with replies produced by `responder(messages) -> str`.
+    Point `ChatOllama` at it with `base_url=server.url` or the `OLLAMA_HOST` environment variable.
+    """
+
+    # --- Methods ---
+    def __init__(self, responder: Callable[[list[dict]], str] | None = None, host: str = "127.0.0.1",
+                 port: int = 0, model: str = "llama3.2:3b"):
+        """Initialize the stub server (port 0 picks a free port)."""
+
+        self.responder = responder if responder is not None else (lambda messages: "Yes")
+        self.model = model
+        self.requests = []
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """Base URL of the running server."""
+
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "OllamaStubServer":
+        """Serve requests on a background thread."""
+
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """Serve requests on the calling thread until interrupted."""
+
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def stop(self) -> None:
+        """Shut the server down."""
+
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _make_handler(self):
+        """Build the request handler class bound to this server."""
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/api/tags":
+                    self._send_json({"models": [{"name": stub.model, "model": stub.model}]})
+                elif self.path == "/api/version":
+                    self._send_json({"version": "0.0.0-stub"})
+                else:
+                    self.send_error(404)
+
+            def do_POST(self):
+                if self.path != "/api/chat":
+                    self.send_error(404)
+                    return
+
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                messages = body.get("messages", [])
+                stub.requests.append(body)
+                reply = stub.responder(messages)
+
+                message = {"role": "assistant", "content": reply}
+                final = {
+                    "model": body.get("model", stub.model),
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                    "done": True,
+                    "done_reason": "stop",
+                    "prompt_eval_count": sum(len(m.get("content", "").split()) for m in messages),
+                    "eval_count": len(reply.split()),
+                }
+
+                # Ollama streams newline-delimited JSON by default
+                if body.get("stream", True):
+                    chunk = {**final, "message": message, "done": False}
+                    del chunk["done_reason"], chunk["prompt_eval_count"], chunk["eval_count"]
+                    payload = (json.dumps(chunk) + "\n" +
+                               json.dumps({**final, "message": {"role": "assistant", "content": ""}}) + "\n")
+                    self._send(payload.encode(), "application/x-ndjson")
+                else:
+                    self._send_json({**final, "message": message})
+
+            def _send_json(self, obj):
+                self._send(json.dumps(obj).encode(), "application/json")
+
+            def _send(self, data: bytes, content_type: str):
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    # Run a standalone stub that always gives the same reply, e.g. `python -m ai.models.ollama_stub --reply Yes`
+
+    parser = argparse.ArgumentParser(description="Stand-in Ollama server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--reply", default="Yes")
+    args = parser.parse_args()
+
+    server = OllamaStubServer(lambda messages: args.reply, host=args.host, port=args.port)
+    print(f"Stub Ollama server listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -1,19 +1,30 @@
+from ai.models.gpt import gpt_extract_content
 from ai.models.llama import llama_low_temp
+from ai.prompts import PromptBuilder, TAIL
+
+# Token cap for the router prompt (older messages are cut first)
+MAX_PROMPT_TOKENS = 2000
 
 
 def router(state):
     """Routes messages to research or chat based on whether the last message requires research."""
     # --- Extract state variables ---
     messages = state['messages']
+    transcript = "\n".join(f"{getattr(m, 'type', 'message')}: {getattr(m, 'content', m)}" for m in messages)
 
     # --- Build and invoke prompt ---
-    prompt = f"You are a router that determines whether the last message sent by the user/human would benefit from \
-              research to inform the response. Respond with ONLY 'Yes' (if it requires research) or 'No' (if it \
-              doesn't). Here are the messages: {messages}"
-    res = llama_low_temp.invoke(prompt)
+    prompt = PromptBuilder("router", MAX_PROMPT_TOKENS)
+    prompt.add("messages", transcript, policy=TAIL)
+    text, = prompt.render(
+        "You are a router that determines whether the last message sent by the user/human would benefit from "
+        "research to inform the response. Respond with ONLY 'Yes' (if it requires research) or 'No' (if it "
+        "doesn't). Here are the messages:\n{messages}"
+    )
+    res = llama_low_temp.invoke(text)
+    prompt.record_output(res)
 
     # --- Determine route ---
-    if 'yes' in res.lower():
+    if 'yes' in gpt_extract_content(res).lower():
         return 'research'
     else:
-        return 'chat'
\ No newline at end of file
+        return 'chat'
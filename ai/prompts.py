@@ -0,0 +1,263 @@
+import re
+import threading
+
+import tiktoken
+
+# Tokenizer used for counting (the encoding of the GPT-5 family; close enough for the local Llama model too)
+ENCODING = "o200k_base"
+
+# Truncation policies for prompt sections
+HEAD = "head"               # Keep the beginning of the text
+TAIL = "tail"               # Keep the end of the text (e.g. the most recent conversation)
+DROP_ITEMS = "drop_items"   # Drop whole items, lowest priority first
+
+# Marker appended/prepended where text was cut
+TRUNCATED = "[...]"
+
+# Characters per token assumed when the tokenizer can't be loaded
+CHARS_PER_TOKEN = 4
+
+_encoding = None
+_encoding_lock = threading.Lock()
+
+
+class _EstimateEncoding:
+    """Stand-in tokenizer that cuts text into fixed-size character chunks (about one token each for English prose)."""
+
+    # --- Methods ---
+    def encode(self, text: str, disallowed_special=()) -> list[str]:
+        """Split `text` into chunks of `CHARS_PER_TOKEN` characters."""
+
+        return [text[i:i + CHARS_PER_TOKEN] for i in range(0, len(text), CHARS_PER_TOKEN)]
+
+    def decode(self, tokens: list[str]) -> str:
+        """Join chunks back into text."""
+
+        return "".join(tokens)
+
+
+def _get_encoding():
+    """
+    Load the tokenizer once (loading it is slow enough to matter at startup).
+    tiktoken downloads the encoding on first use unless it is cached (point `TIKTOKEN_CACHE_DIR` at a directory
+    holding it for offline workers); if it can't be loaded, counts fall back to a character-based estimate.
+    """
+
+    global _encoding
+    if _encoding is None:
+        with _encoding_lock:
+            if _encoding is None:
+                try:
+                    _encoding = tiktoken.get_encoding(ENCODING)
+                except Exception as e:
+                    print(f"::Tokenizer {ENCODING} unavailable ({type(e).__name__}), estimating prompt tokens")
+                    _encoding = _EstimateEncoding()
+
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Number of tokens in `text` with the local tokenizer."""
+
+    return len(_get_encoding().encode(text, disallowed_special=()))
+
+
+def truncate(text: str, max_tokens: int, policy: str = HEAD) -> str:
+    """Cut `text` down to at most `max_tokens` tokens, keeping its head or tail."""
+
+    tokens = _get_encoding().encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+
+    keep = max(0, max_tokens - count_tokens(TRUNCATED) - 1)
+    if keep == 0:
+        return ""
+    if policy == TAIL:
+        return f"{TRUNCATED} {_get_encoding().decode(tokens[-keep:])}"
+
+    return f"{_get_encoding().decode(tokens[:keep])} {TRUNCATED}"
+
+
+class TokenHistogram:
+    """Thread-safe histogram of token counts in power-of-two buckets."""
+
+    # --- Methods ---
+    def __init__(self):
+        """Initialize an empty histogram."""
+
+        self.buckets = {}
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self._lock = threading.Lock()
+
+    def record(self, tokens: int) -> None:
+        """Add one observation."""
+
+        bucket = 1 << max(0, tokens - 1).bit_length()   # smallest power of two >= tokens
+        with self._lock:
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+            self.count += 1
+            self.total += tokens
+            self.max = max(self.max, tokens)
+
+    def snapshot(self) -> dict:
+        """Bucket counts (keyed by upper bound) and summary statistics."""
+
+        with self._lock:
+            return {
+                "count": self.count,
+                "mean": self.total / self.count if self.count else 0.0,
+                "max": self.max,
+                "buckets": dict(sorted(self.buckets.items())),
+            }
+
+
+class PromptStats:
+    """Per-node input/output token histograms."""
+
+    # --- Methods ---
+    def __init__(self):
+        """Initialize with no nodes recorded."""
+
+        self.nodes = {}
+        self._lock = threading.Lock()
+
+    def node(self, node: str) -> dict:
+        """Input/output histograms for `node`, created on first use."""
+
+        with self._lock:
+            return self.nodes.setdefault(node, {"input": TokenHistogram(), "output": TokenHistogram()})
+
+    def snapshot(self) -> dict:
+        """Histogram snapshots for every node."""
+
+        with self._lock:
+            nodes = dict(self.nodes)
+
+        return {node: {kind: h.snapshot() for kind, h in hists.items()} for node, hists in nodes.items()}
+
+
+# Process-wide prompt statistics
+PROMPT_STATS = PromptStats()
+
+
+def output_tokens(result) -> int:
+    """Output token count of a model result (reported usage if available, otherwise counted locally)."""
+
+    usage = getattr(result, "usage_metadata", None)
+    if usage and usage.get("output_tokens") is not None:
+        return usage["output_tokens"]
+
+    if hasattr(result, "model_dump_json"):
+        return count_tokens(result.model_dump_json())
+
+    return count_tokens(str(getattr(result, "content", result)))
+
+
+class PromptBuilder:
+    """
+    Builds a node's prompt from fixed templates plus variable sections, enforcing the node's token cap.
+    Templates reference sections as `{name}`. When the prompt is over the cap, sections are shrunk lowest priority
+    first according to their truncation policy; section policies can be overridden per node in configuration.
+    """
+
+    # --- Methods ---
+    def __init__(self, node: str, max_tokens: int, policies: dict | None = None):
+        """Initialize a builder for `node` with its token cap and optional per-section policy overrides."""
+
+        self.node = node
+        self.max_tokens = max_tokens
+        self.policies = policies or {}
+        self.sections = {}
+        self.input_tokens = 0
+
+    def add(self, name: str, text: str, policy: str = HEAD, priority: int = 0) -> "PromptBuilder":
+        """Add a text section."""
+
+        self.sections[name] = {
+            "items": [text], "priorities": [0], "tokens": None, "separator": "",
+            "policy": self.policies.get(name, policy), "priority": priority,
+        }
+        return self
+
+    def add_items(self, name: str, items: list[str], item_priorities: list | None = None,
+                  item_tokens: list[int] | None = None, separator: str = "\n\n",
+                  priority: int = 0) -> "PromptBuilder":
+        """
+        Add a section made of separate items (e.g. resources) that can be dropped individually.
+        Items are dropped lowest priority first (later items first among equals); `item_tokens` gives their token
+        counts if already known.
+        """
+
+        self.sections[name] = {
+            "items": list(items), "priorities": list(item_priorities or [0] * len(items)),
+            "tokens": list(item_tokens) if item_tokens is not None else None, "separator": separator,
+            "policy": self.policies.get(name, DROP_ITEMS), "priority": priority,
+        }
+        return self
+
+    def render(self, *templates: str) -> tuple[str, ...]:
+        """Fit sections to the cap and substitute them into `templates`; records the input token count."""
+
+        # Tokens used by the fixed parts of the templates
+        fixed = "".join(templates)
+        for name in self.sections:
+            fixed = fixed.replace(f"{{{name}}}", "")
+        fixed_tokens = count_tokens(fixed)
+        available = max(0, self.max_tokens - fixed_tokens)
+
+        texts = {name: self._join(section) for name, section in self.sections.items()}
+        sizes = {name: count_tokens(text) for name, text in texts.items()}
+
+        # Shrink sections, lowest priority first, until everything fits
+        for name in sorted(self.sections, key=lambda n: self.sections[n]["priority"]):
+            overflow = sum(sizes.values()) - available
+            if overflow <= 0:
+                break
+            texts[name] = self._shrink(self.sections[name], max(0, sizes[name] - overflow))
+            sizes[name] = count_tokens(texts[name])
+
+        # Substitute in a single pass so section text that happens to contain a placeholder is left alone
+        pattern = re.compile("|".join(re.escape(f"{{{name}}}") for name in texts)) if texts else None
+        rendered = [pattern.sub(lambda m: texts[m.group(0)[1:-1]], t) if pattern else t for t in templates]
+
+        self.input_tokens = fixed_tokens + sum(sizes.values())
+        PROMPT_STATS.node(self.node)["input"].record(self.input_tokens)
+
+        return tuple(rendered)
+
+    def record_output(self, result) -> None:
+        """Record the output token count of the model's result."""
+
+        PROMPT_STATS.node(self.node)["output"].record(output_tokens(result))
+
+    @staticmethod
+    def _join(section: dict) -> str:
+        """Render a section's items."""
+
+        return section["separator"].join(section["items"])
+
+    def _shrink(self, section: dict, max_tokens: int) -> str:
+        """Shrink a section to at most `max_tokens` using its policy."""
+
+        if section["policy"] != DROP_ITEMS:
+            return truncate(self._join(section), max_tokens, section["policy"])
+
+        # Drop the lowest-priority items (keeping the rest in their original order) until the section fits, sizing
+        # it from per-item counts rather than re-tokenizing it after every drop
+        items = section["items"]
+        tokens = section["tokens"] or [count_tokens(item) for item in items]
+        separator_tokens = count_tokens(section["separator"])
+        size = sum(tokens) + separator_tokens * max(0, len(items) - 1)
+
+        by_priority = sorted(range(len(items)), key=lambda i: (section["priorities"][i], -i))
+        kept = set(range(len(items)))
+        for i in by_priority:
+            if size <= max_tokens or len(kept) == 1:
+                break
+            kept.remove(i)
+            size -= tokens[i] + separator_tokens
+
+        # Per-item counts are approximate at item boundaries, and a single remaining item may still be too large
+        return truncate(section["separator"].join(item for j, item in enumerate(items) if j in kept), max_tokens)
@@ -0,0 +1,20 @@
+import sqlite3
+
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+# Default location of the local checkpoint database
+DEFAULT_PATH = "checkpoints.sqlite"
+
+
+def sqlite_checkpointer(path: str = DEFAULT_PATH) -> SqliteSaver:
+    """
+    Create a SQLite checkpointer for the research graph.
+    State is serialized with LangGraph's msgpack serializer (resource records are slotted dataclasses, so they encode
+    compactly), and WAL journaling keeps the per-node checkpoint writes cheap.
+    """
+
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA synchronous=NORMAL;")
+
+    return SqliteSaver(conn)
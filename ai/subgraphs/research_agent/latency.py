@@ -0,0 +1,168 @@
+import math
+import threading
+import time
+from typing import Callable
+
+# Nodes that run on every research iteration (write_queries -> plan_queries -> query_vector_db -> assess_resources)
+ITERATION_NODES = ("write_queries", "plan_queries", "query_vector_db", "assess_resources")
+
+# Per-node estimates (seconds) used until a node has actually been timed
+DEFAULT_ESTIMATES = {
+    "create_conversation": 2.0,
+    "write_queries": 4.0,
+    "plan_queries": 0.2,
+    "query_vector_db": 10.0,
+    "assess_resources": 4.0,
+    "write_response": 20.0,
+}
+
+# Ordered reasoning effort levels, cheapest first
+EFFORT_LEVELS = ["minimal", "low", "medium", "high"]
+
+# Fraction of the budget left below which nodes start degrading
+LOW_BUDGET = 0.5
+CRITICAL_BUDGET = 0.25
+
+
+class NodeTimer:
+    """Thread-safe exponential moving average of per-node wall-clock times."""
+
+    # --- Methods ---
+    def __init__(self, alpha: float = 0.3, defaults: dict | None = None):
+        """Initialize the timer with a smoothing factor and optional default estimates."""
+
+        self.alpha = alpha
+        self.averages = dict(DEFAULT_ESTIMATES if defaults is None else defaults)
+        self.calls = {}     # node -> runs recorded
+        self.elapsed = {}   # node -> total seconds recorded
+        self._lock = threading.Lock()
+
+    def record(self, node: str, seconds: float) -> None:
+        """Fold a new observation for `node` into its moving average."""
+
+        with self._lock:
+            self.calls[node] = self.calls.get(node, 0) + 1
+            self.elapsed[node] = self.elapsed.get(node, 0.0) + seconds
+            previous = self.averages.get(node)
+            if previous is None:
+                self.averages[node] = seconds
+            else:
+                self.averages[node] = self.alpha * seconds + (1 - self.alpha) * previous
+
+    def predict(self, node: str) -> float:
+        """Predicted wall-clock time for a single run of `node`."""
+
+        with self._lock:
+            return self.averages.get(node, 0.0)
+
+    def predict_iteration(self) -> float:
+        """Predicted wall-clock time for one more research iteration."""
+
+        return sum(self.predict(node) for node in ITERATION_NODES)
+
+    def timed(self, node: str, func: Callable) -> Callable:
+        """Wrap a node so each call is timed and recorded under `node`."""
+
+        def wrapped(state):
+            start = time.perf_counter()
+            try:
+                return func(state)
+            finally:
+                self.record(node, time.perf_counter() - start)
+
+        return wrapped
+
+    def snapshot(self) -> dict:
+        """Copy of the current per-node averages."""
+
+        with self._lock:
+            return dict(self.averages)
+
+    def totals(self) -> dict:
+        """Per-node `(runs, total seconds)` recorded so far (windowed rates can be taken from the differences)."""
+
+        with self._lock:
+            return {node: (self.calls[node], self.elapsed[node]) for node in self.calls}
+
+
+class WaitStats:
+    """Thread-safe totals of time spent waiting on shared resources (summary worker pools, the embedder)."""
+
+    # --- Methods ---
+    def __init__(self):
+        """Initialize with no waits recorded."""
+
+        self.waits = {}     # resource -> [waits, total seconds, max seconds]
+        self._lock = threading.Lock()
+
+    def record(self, resource: str, seconds: float) -> None:
+        """Record one wait on `resource`."""
+
+        with self._lock:
+            totals = self.waits.setdefault(resource, [0, 0.0, 0.0])
+            totals[0] += 1
+            totals[1] += seconds
+            totals[2] = max(totals[2], seconds)
+
+    def totals(self) -> dict:
+        """Per-resource `(waits, total seconds)` recorded so far."""
+
+        with self._lock:
+            return {resource: (count, total) for resource, (count, total, _) in self.waits.items()}
+
+    def snapshot(self) -> dict:
+        """Per-resource wait count, mean and max."""
+
+        with self._lock:
+            return {
+                resource: {"count": count, "mean": total / count, "max": longest}
+                for resource, (count, total, longest) in self.waits.items()
+            }
+
+
+# Process-wide wait statistics
+WAIT_STATS = WaitStats()
+
+
+def remaining_budget(state) -> float | None:
+    """Seconds left before the run's deadline, or None if the run has no latency budget."""
+
+    deadline = state.get("deadline")
+    if deadline is None:
+        return None
+
+    return deadline - time.time()
+
+
+def budget_fraction(state) -> float | None:
+    """Fraction (0-1) of the latency budget still available, or None if the run has no latency budget."""
+
+    budget = state.get("latency_budget")
+    remaining = remaining_budget(state)
+    if remaining is None or not budget:
+        return None
+
+    return max(0.0, min(1.0, remaining / budget))
+
+
+def reasoning_effort(state, effort: str) -> str:
+    """Lower the requested reasoning effort as the latency budget runs out."""
+
+    fraction = budget_fraction(state)
+    if fraction is None or fraction >= LOW_BUDGET:
+        return effort
+    if fraction < CRITICAL_BUDGET:
+        return EFFORT_LEVELS[0]
+
+    return EFFORT_LEVELS[max(0, EFFORT_LEVELS.index(effort) - 1)]
+
+
+def summary_fanout(state, count: int) -> int:
+    """Number of retrieved resources worth summarizing given the latency budget left."""
+
+    fraction = budget_fraction(state)
+    if fraction is None or fraction >= LOW_BUDGET or count == 0:
+        return count
+
+    # Scale linearly down to a single resource once the budget is nearly gone
+    return max(1, math.ceil(count * fraction / LOW_BUDGET))
@@ -1,11 +1,29 @@
+from ai.models.cascade import CascadeModel
 from ai.models.gpt import gpt5_nano, gpt5
+from ai.models.llama import llama_sampling
 
 # Model configuration for graph nodes
 MODEL_CONFIG = {
-    "create_conversation": gpt5_nano,
+    "create_conversation": CascadeModel("create_conversation", llama_sampling, gpt5_nano, threshold=0.8),
     "query_vector_db": gpt5_nano,
     "write_queries": gpt5_nano,
-    "assess_resources_classifier": gpt5_nano,
+    "assess_resources_classifier": CascadeModel("assess_resources_classifier", llama_sampling, gpt5_nano),
     "assess_resources_feedback": gpt5_nano,
     "write_response": gpt5
 }
+
+# Prompt token caps (plus optional per-section truncation policy overrides, e.g. {"context": "head"}) for graph nodes
+PROMPT_CONFIG = {
+    "create_conversation": {"max_tokens": 8000},
+    "query_vector_db": {"max_tokens": 6000},
+    "write_queries": {"max_tokens": 4000},
+    "assess_resources_classifier": {"max_tokens": 8000},
+    "assess_resources_feedback": {"max_tokens": 8000},
+    "write_response": {"max_tokens": 16000},
+}
+
+
+def cascade_stats() -> dict:
+    """Escalation rate and latency saved for every node configured with a cascade model."""
+
+    return {node: model.stats.snapshot() for node, model in MODEL_CONFIG.items() if isinstance(model, CascadeModel)}
@@ -2,33 +2,66 @@ import time
 
 from langchain_core.messages import SystemMessage, HumanMessage
 
+from ai.models.cascade import normalize_answer
 from ai.models.gpt import gpt_extract_content
-from ai.subgraphs.research_agent.model_config import MODEL_CONFIG
+from ai.prompts import PromptBuilder
+from ai.subgraphs.research_agent.model_config import MODEL_CONFIG, PROMPT_CONFIG
 from ai.subgraphs.research_agent.schemas.graph_state import ResearchAgentState
+from ai.subgraphs.research_agent.schemas.resource import (
+    ResourceRecord, render_resources, resource_priorities, resource_tokens
+)
 
 # Max queries allowed
 MAX_SOURCES = 3
 
-def get_feedback(last_message, resource_summaries):
+# Max distinct queries searched per turn (deduplicated queries can stop adding sources, so cap the loop on these too)
+MAX_QUERIES = 9
+
+# Max research iterations per turn (each runs write_queries -> plan_queries -> query_vector_db -> assess_resources)
+MAX_ITERATIONS = 4
+
+def render_items(resources: list[ResourceRecord]) -> tuple[list[str], list[int], list[int]] | None:
+    """Render resources once as prompt items with their priorities and token counts (None if there are none)."""
+
+    if not resources:
+        return None
+
+    return render_resources(resources), resource_priorities(resources), resource_tokens(resources)
+
+def resource_prompt(node: str, last_message: str, items: tuple | None) -> PromptBuilder:
+    """Prompt builder for `node` with the last message and rendered resources (lowest-ranked dropped first)."""
+
+    prompt = PromptBuilder(node, **PROMPT_CONFIG[node])
+    prompt.add("last_message", last_message, priority=1)
+    if items:
+        texts, priorities, tokens = items
+        prompt.add_items("resources", texts, item_priorities=priorities, item_tokens=tokens)
+    else:
+        prompt.add("resources", "No research resources collected yet.")
+
+    return prompt
+
+def get_feedback(last_message, items):
     """Get feedback on why the current research resources are insufficient to answer the user's query."""
 
     # Get configured feedback model
     feedback_model = MODEL_CONFIG["assess_resources_feedback"]
 
     # Build feedback prompt (system and user message)
-    feedback_system_msg = SystemMessage(content=(
+    prompt = resource_prompt("assess_resources_feedback", last_message, items)
+    system_text, user_text = prompt.render(
         "You are an assistant that provides feedback on why the current research resources are insufficient to answer "
-        "the user's query. Provide specific reasons and suggestions for what additional research is needed.\n"
-    ))
-
-    feedback_user_msg = HumanMessage(content=(
-        f"Here is the user's last message:\n{last_message}\n\n"
-        f"Here are summaries of the research results obtained so far:\n{resource_summaries}\n"
+        "the user's query. Provide specific reasons and suggestions for what additional research is needed.\n",
+        "Here is the user's last message:\n{last_message}\n\n"
+        "Here are summaries of the research results obtained so far:\n{resources}\n"
         "Explain why this research is insufficient and what additional research is needed."
-    ))
+    )
+    feedback_system_msg = SystemMessage(content=system_text)
+    feedback_user_msg = HumanMessage(content=user_text)
 
     # Invoke feedback model and extract output
     feedback_result = feedback_model.invoke([feedback_system_msg, feedback_user_msg], reasoning={"effort": "minimal"})
+    prompt.record_output(feedback_result)
     feedback = gpt_extract_content(feedback_result)
 
     return feedback
@@ -42,32 +75,34 @@ def assess_resources(state: ResearchAgentState):
 
     # Extract graph state variables
     conversation = state.get("conversation", {})
-    resource_summaries = state.get("resource_summaries") or "No research resources collected yet."
+    resources = state.get("resource_summaries") or []
+    last_message = conversation.get("last_user_message", "No last user message found")
 
     # Get configured model
     classifier_model = MODEL_CONFIG["assess_resources_classifier"]
 
     # Build prompt (system and user message)
-    system_msg = SystemMessage(content=(
+    items = render_items(resources)     # rendered once, shared by the classifier and feedback prompts
+    prompt = resource_prompt("assess_resources_classifier", last_message, items)
+    system_text, user_text = prompt.render(
         "You are a reasoning assistant that evaluates whether the provided research is sufficient to answer the user's query.\n"
         "Decide if the current research can support a satisfactory answer now. Just make sure it at least covers all"
         "aspects of the question.\n\n"
-        "Return NOTHING but 'Yes' if the research is sufficient, or 'No' if more research is needed.\n"
-    ))
-
-    last_message = conversation.get("last_user_message", "No last user message found")
-    user_msg = HumanMessage(content=(
-        f"Here is the user's last message:\n{last_message}\n\n"
-        f"Here are summaries of the research results obtained so far:\n{resource_summaries}\n"
-    ))
+        "Return NOTHING but 'Yes' if the research is sufficient, or 'No' if more research is needed.\n",
+        "Here is the user's last message:\n{last_message}\n\n"
+        "Here are summaries of the research results obtained so far:\n{resources}\n"
+    )
+    system_msg = SystemMessage(content=system_text)
+    user_msg = HumanMessage(content=user_text)
 
     # Invoke model and extract output
     result = classifier_model.invoke([system_msg, user_msg], reasoning={"effort": "minimal"})
-    query_satisfied = gpt_extract_content(result).strip().lower() == "yes"  # yes = True, otherwise False
+    prompt.record_output(result)
+    query_satisfied = normalize_answer(gpt_extract_content(result)) == "yes"  # yes = True, otherwise False
 
     # If not satisfied, get feedback on what additional research is needed
     if not query_satisfied:
-        feedback = get_feedback(last_message, resource_summaries)
+        feedback = get_feedback(last_message, items)
     else:
         feedback = ""
 
@@ -75,5 +110,15 @@ def assess_resources(state: ResearchAgentState):
     end = time.perf_counter()
     print(f"\r\033[K::Resources assessed in {end - start:.2f}s")
 
-    return {"query_satisfied": query_satisfied or len(resource_summaries) >= MAX_SOURCES, "queries_feedback": feedback}
+    # Stop researching once enough sources or distinct queries have been gathered, when the last search found nothing
+    # new (follow-ups keep returning passages already summarized), or after the last allowed iteration
+    iterations = (state.get("iterations") or 0) + 1
+    enough = (
+        len(resources) >= MAX_SOURCES
+        or len(state.get("executed_queries") or []) >= MAX_QUERIES
+        or not state.get("new_resources")
+        or iterations >= MAX_ITERATIONS
+    )
+
+    return {"query_satisfied": query_satisfied or enough, "queries_feedback": feedback, "iterations": iterations}
 
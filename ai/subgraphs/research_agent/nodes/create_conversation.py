@@ -4,21 +4,25 @@ from typing import List
 from langchain_core.messages import HumanMessage, SystemMessage
 
 from ai.models.gpt import gpt_extract_content
-from ai.subgraphs.research_agent.model_config import MODEL_CONFIG
+from ai.prompts import PromptBuilder, TAIL
+from ai.subgraphs.research_agent.model_config import MODEL_CONFIG, PROMPT_CONFIG
 from ai.subgraphs.research_agent.schemas.conversation import Conversation
 from ai.subgraphs.research_agent.schemas.graph_state import ResearchAgentState
 
+# Summary used when there is no prior conversation
+EMPTY_CONVERSATION = "Conversation is empty."
+
 
 def create_conversation(state: ResearchAgentState):
-    """Initialize a new conversation by summarizing prior messages and extracting the last user message."""
+    """
+    Initialize a new conversation by summarizing prior messages and extracting the last user message.
+    On a checkpointed thread, the stored summary is updated with the previous exchange instead.
+    """
 
     # Start timing and log
     print("::Starting conversation and summarization...", end="", flush=True)
     start = time.perf_counter()
 
-    # Get configured model
-    model = MODEL_CONFIG["create_conversation"]
-
     # Extract incoming raw messages
     if 'messages' in state and isinstance(state['messages'], list):
         incoming_messages = state['messages']
@@ -33,28 +37,47 @@ def create_conversation(state: ResearchAgentState):
             break
 
     # Build prior context
-    context_parts: List[str] = [
-        getattr(m, "content", "") for m in incoming_messages[1:-1]
-        if getattr(m, "content", None)
-    ]
+    previous = state.get('conversation')
+    context_parts: List[str]
+    if previous:
+        # Resumed (checkpointed) thread: fold the last exchange into the stored rolling summary rather than
+        # re-summarizing the whole history
+        context_parts = [
+            previous.get('summarized_context', ''),
+            f"User: {previous.get('last_user_message', '')}",
+            f"Assistant: {state.get('response', '')}",
+        ]
+    else:
+        context_parts = [
+            getattr(m, "content", "") for m in incoming_messages[1:-1]
+            if getattr(m, "content", None)
+        ]
     context = '\n'.join(context_parts) if context_parts else ''
 
-    # Build prompt (system and user message)
-    system_msg = SystemMessage(content=(
-        "You are a conversation summarizer. Your job is to summarize the conversation between the user and the AI "
-        "assistant, focusing on the key points discussed, questions asked, and any relevant context that would help.\n"
-        "Your summary should at most half the length of the original conversation. If there is no conversation, just "
-        "say 'Conversation is empty.'"
-    ))
-
-    user_msg = HumanMessage(content=(
-        "Conversation history:\n"
-        f"{context}\n\n"
-    ))
-
-    # Invoke model and extract content
-    result = model.invoke([system_msg, user_msg], reasoning={"effort": "minimal"})
-    summarized = gpt_extract_content(result)
+    # Nothing to summarize on the first turn, so the model isn't called
+    if context_parts:
+        # Get configured model
+        model = MODEL_CONFIG["create_conversation"]
+
+        # Build prompt (system and user message), keeping the most recent history if it's over the token cap
+        prompt = PromptBuilder("create_conversation", **PROMPT_CONFIG["create_conversation"])
+        prompt.add("context", context, policy=TAIL)
+        system_text, user_text = prompt.render(
+            "You are a conversation summarizer. Your job is to summarize the conversation between the user and the AI "
+            "assistant, focusing on the key points discussed, questions asked, and any relevant context that would "
+            "help.\nYour summary should at most half the length of the original conversation.",
+            "Conversation history:\n"
+            "{context}\n\n"
+        )
+        system_msg = SystemMessage(content=system_text)
+        user_msg = HumanMessage(content=user_text)
+
+        # Invoke model and extract content
+        result = model.invoke([system_msg, user_msg], reasoning={"effort": "minimal"})
+        prompt.record_output(result)
+        summarized = gpt_extract_content(result)
+    else:
+        summarized = EMPTY_CONVERSATION
 
     # Create conversation object
     conversation: Conversation = {
@@ -62,15 +85,21 @@ def create_conversation(state: ResearchAgentState):
         'summarized_context': summarized,
     }
 
-    # Initialize remaining required keys in state
-    state.setdefault('response', '')
-    state.setdefault('queries', [])
-    state.setdefault('queries_feedback', '')
-    state.setdefault('query_satisfied', False)
-    state.setdefault('resource_summaries', list())
-
     # End timing and log
     end = time.perf_counter()
     print(f"\r\033[K::Conversation initialized in {end - start:.2f}s")
 
-    return {"conversation": conversation, "messages": []}
+    # Initialize remaining keys for this turn (None clears the append-only channels)
+    return {
+        "conversation": conversation,
+        "messages": [],
+        "response": "",
+        "queries": [],
+        "queries_feedback": "",
+        "query_satisfied": False,
+        "search_plan": [],
+        "executed_queries": None,
+        "resource_summaries": None,
+        "new_resources": 0,
+        "iterations": 0,
+    }
@@ -0,0 +1,119 @@
+import threading
+import time
+
+import numpy as np
+
+from ai.subgraphs.research_agent.latency import WAIT_STATS
+from ai.subgraphs.research_agent.schemas.graph_state import ResearchAgentState
+from ai.subgraphs.research_agent.schemas.query_plan import ExecutedQuery, PlannedSearch
+from dbs.qdrant import Qdrant
+
+# Cosine similarity at or above which a query counts as a repeat of one already searched with the same filters
+SIMILARITY_THRESHOLD = 0.95
+
+
+class PlannerStats:
+    """Thread-safe counters for the searches and summaries saved by query planning."""
+
+    # --- Methods ---
+    def __init__(self):
+        """Initialize all counters at zero."""
+
+        self.queries = 0
+        self.searches = 0
+        self.dropped = 0
+        self.summaries_estimated = 0    # Summaries dropped queries would have needed (LIMIT per query, an upper bound)
+        self.summaries_skipped = 0      # Retrieved points not summarized again because this turn already had them
+        self._lock = threading.Lock()
+
+    def record_plan(self, queries: int, searches: int, dropped: int, summaries_estimated: int) -> None:
+        """Record one planning pass."""
+
+        with self._lock:
+            self.queries += queries
+            self.searches += searches
+            self.dropped += dropped
+            self.summaries_estimated += summaries_estimated
+
+    def record_summaries_skipped(self, count: int) -> None:
+        """Record retrieved points whose summary was already available."""
+
+        with self._lock:
+            self.summaries_skipped += count
+
+    def snapshot(self) -> dict:
+        """Copy of the current counters."""
+
+        with self._lock:
+            return {
+                "queries": self.queries,
+                "searches": self.searches,
+                "queries_merged": self.queries - self.dropped - self.searches,  # Round-trips saved, still searched
+                "queries_dropped": self.dropped,                                  # Searches actually avoided
+                "summaries_estimated": self.summaries_estimated,
+                "summaries_skipped": self.summaries_skipped,
+            }
+
+
+# Process-wide planner statistics
+PLANNER_STATS = PlannerStats()
+
+
+def plan_queries(state: ResearchAgentState, qdrant: Qdrant):
+    """
+    Turn the generated queries into a search plan.
+    Filters are canonicalized to stored author/source names, queries nearly identical to one already searched this
+    turn with the same filters are dropped, and the remaining queries that share filters are merged into one search.
+    """
+
+    # Start timing and log
+    print("::Planning searches...", end="", flush=True)
+    start = time.perf_counter()
+
+    # Extract graph state variables
+    queries = state.get("queries") or []
+    executed = state.get("executed_queries") or []
+
+    # Embed once here (the plan carries the vectors to the search); filters are matched while the embedder works
+    submitted = time.perf_counter()
+    pending = qdrant.embedder.submit_batch([q.query for q in queries])
+    matching = time.perf_counter()
+    keys = [qdrant.canonical_filters(q.filters) for q in queries]
+    waiting = time.perf_counter()
+    vectors = pending.result()
+    WAIT_STATS.record("embedder", (matching - submitted) + (time.perf_counter() - waiting))
+
+    # Previously searched vectors, grouped by canonical filters
+    seen: dict[tuple, list[np.ndarray]] = {}
+    for e in executed:
+        seen.setdefault((e.author, e.source), []).append(np.frombuffer(e.vector, dtype=np.float16).astype(np.float32))
+
+    plan: dict[tuple, PlannedSearch] = {}
+    new_executed = []
+    dropped = 0
+    for q, key, vector in zip(queries, keys, vectors):
+        unit = np.asarray(vector, dtype=np.float32)
+        unit /= np.linalg.norm(unit) or 1.0
+
+        # Drop near-duplicates of anything already searched (or planned) with the same filters
+        if any(float(unit @ other) >= SIMILARITY_THRESHOLD for other in seen.get(key, [])):
+            dropped += 1
+            continue
+
+        seen.setdefault(key, []).append(unit)
+        new_executed.append(ExecutedQuery(author=key[0], source=key[1], vector=unit.astype(np.float16).tobytes()))
+
+        # Merge queries that share filters into one search
+        planned = plan.setdefault(key, PlannedSearch(author=key[0], source=key[1], queries=[], vectors=[]))
+        planned.queries.append(q.query)
+        planned.vectors.append(vector)
+
+    # A dropped query would have retrieved (and summarized) up to LIMIT points
+    search_plan = list(plan.values())
+    PLANNER_STATS.record_plan(len(queries), len(search_plan), dropped, dropped * qdrant.LIMIT)
+
+    # End timing and log
+    end = time.perf_counter()
+    print(f"\r\033[K::Planned {len(search_plan)} search(es) from {len(queries)} queries in {end - start:.2f}s")
+
+    return {"search_plan": search_plan, "executed_queries": new_executed}
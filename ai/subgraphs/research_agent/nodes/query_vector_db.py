@@ -1,37 +1,138 @@
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterator
 
 from langchain_core.messages import SystemMessage, HumanMessage
+from langgraph.config import get_stream_writer
 
 from ai.models.gpt import gpt_extract_content
-from ai.subgraphs.research_agent.model_config import MODEL_CONFIG
+from ai.prompts import PromptBuilder, count_tokens
+from ai.subgraphs.research_agent.latency import WAIT_STATS, summary_fanout
+from ai.subgraphs.research_agent.model_config import MODEL_CONFIG, PROMPT_CONFIG
+from ai.subgraphs.research_agent.nodes.plan_queries import PLANNER_STATS
 from ai.subgraphs.research_agent.schemas.graph_state import ResearchAgentState
+from ai.subgraphs.research_agent.schemas.resource import ResourceRecord
 from dbs.qdrant import Qdrant
 
 
 def summarize_resource(model, resource_text):
     """Summarize a single research resource using the provided model."""
 
-    # Construct prompt (system and user message)
-    system_msg = SystemMessage(content=(
+    # Construct prompt (system and user message), cutting oversized resources down to the token cap
+    prompt = PromptBuilder("query_vector_db", **PROMPT_CONFIG["query_vector_db"])
+    prompt.add("resource", resource_text)
+    system_text, user_text = prompt.render(
         "You are a summarizing agent. Summarize the following resource with these guidelines:\n"
         "- Keep it concise (should be around half the size of original)\n"
         "- Focus on key arguments, concepts, and ideas presented\n"
         "- Retain as many full direct quotes as possible\n"
-        "- Return the summary in full sentences and paragraphs\n\n"
-    ))
-
-    user_msg = HumanMessage(content=f"Here is a resource to summarize:\n---\n{resource_text}\n---\n")
+        "- Return the summary in full sentences and paragraphs\n\n",
+        "Here is a resource to summarize:\n---\n{resource}\n---\n"
+    )
+    system_msg = SystemMessage(content=system_text)
+    user_msg = HumanMessage(content=user_text)
 
     # Invoke model and return extracted output
     res = model.invoke([system_msg, user_msg], reasoning={"effort": "minimal"})
+    prompt.record_output(res)
     return gpt_extract_content(res)
 
+def queued_summary(model, resource_text, submitted: float):
+    """Summarize a resource, recording how long it waited for a free summary worker."""
+
+    WAIT_STATS.record("summary_queue", time.perf_counter() - submitted)
+    return summarize_resource(model, resource_text)
+
+def stream_resources(state: ResearchAgentState, qdrant: Qdrant, model) -> Iterator[ResourceRecord]:
+    """
+    Retrieve and summarize resources as a pipeline.
+    Searches are drained on their own thread, which submits a search's summaries as soon as that search returns, and
+    resources are yielded in a stable order (plan order, then rank) regardless of which search or summary finishes
+    first. Waiting on one summary never holds up submitting the next search's.
+    """
+
+    plan = state.get("search_plan") or []
+
+    # Points already summarized this turn are not summarized (or emitted) again
+    previous = {r.id for r in state.get("resource_summaries") or []}
+    skipped = set()
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        summaries = {}                              # point id -> summary future (summarized once per point)
+        searches = [Future() for _ in plan]         # search index -> future of that search's points
+
+        def submit_searches():
+            try:
+                for index, points in qdrant.stream_plan(plan):
+                    # Only summarize as many top-ranked points per search as the latency budget allows
+                    points = points[:summary_fanout(state, len(points))]
+
+                    # Start summarizing this search's points right away
+                    for point in points:
+                        if point.id in previous:
+                            skipped.add(point.id)
+                        elif point.id not in summaries:
+                            payload = point.payload or {}
+                            content = payload.get("text", "")
+                            author = payload.get("author", "Unknown Author")
+                            source_title = payload.get("source", "Unknown Source")
+                            resource_text = f'"""\n{content}\n"""\n- {author}, {source_title}\n'
+                            summaries[point.id] = executor.submit(
+                                queued_summary, model, resource_text, time.perf_counter()
+                            )
+
+                    searches[index].set_result(points)
+            except Exception as e:
+                for search in searches:
+                    if not search.done():
+                        search.set_exception(e)
+
+            # A search that returned nothing for its index still has to release the emitter
+            for search in searches:
+                if not search.done():
+                    search.set_result([])
+
+        submitter = threading.Thread(target=submit_searches, daemon=True)
+        submitter.start()
+        try:
+            # A point found by several searches takes its best rank among them, so ranks can only be settled once
+            # every search is in. Searches return long before summaries do, and summaries are already running
+            results = [search.result() for search in searches]
+            ranks = {}
+            for planned, points in zip(plan, results):
+                for position, point in enumerate(points):
+                    rank = position // len(planned.queries)     # fused results interleave the merged queries
+                    ranks[point.id] = min(rank, ranks.get(point.id, rank))
+
+            # Emit in plan order as summaries become available
+            emitted = set(previous)
+            for points in results:
+                for point in points:
+                    if point.id in emitted:
+                        continue
+                    emitted.add(point.id)
+
+                    payload = point.payload or {}
+                    summary = summaries[point.id].result()
+                    yield ResourceRecord(
+                        id=point.id,
+                        source=payload.get("source", "Unknown Source"),
+                        author=payload.get("author", "Unknown Author"),
+                        summary=summary,
+                        tokens=count_tokens(summary),
+                        score=point.score,
+                        rank=ranks[point.id]
+                    )
+        finally:
+            submitter.join()
+
+    PLANNER_STATS.record_summaries_skipped(len(skipped))
+
 def query_vector_db(state: ResearchAgentState, qdrant: Qdrant):
     """
-    Query the vector database with the given query and filters.
-    Uses fuzzy matching to find best-matching authors and sources from PostgreSQL metadata.
-    Returns accumulated resources and increments query count.
+    Run the planned vector database searches (see `plan_queries`) and summarize the retrieved resources.
+    Returns the newly summarized resources.
     """
 
     # Start timing and log
@@ -41,30 +142,26 @@ def query_vector_db(state: ResearchAgentState, qdrant: Qdrant):
     # Get configured model
     model = MODEL_CONFIG["query_vector_db"]
 
-    # Extract graph state variables
-    queries = state.get("queries")
-    old_summaries = state.get("resource_summaries", [])
-    new_summaries = old_summaries.copy()
-
-    # Query vector DB
-    resources = []
-    responses = qdrant.batch_query(queries)
-    for payload in responses:
-        content = payload.get("text", "")
-        author = payload.get("author", "Unknown Author")
-        source_title = payload.get("source", "Unknown Source")
-        resource_text = f'"""\n{content}\n"""\n- {author}, {source_title}\n'
-        resources.append(resource_text)
-
-    # Summarize new resources in parallel
-    with ThreadPoolExecutor(max_workers=5) as executor:
-        future_to_resource = {executor.submit(summarize_resource, model, r): r for r in resources}
-        for future in as_completed(future_to_resource):
-            summary = future.result()
-            new_summaries.append(gpt_extract_content(summary))
+    # Collect resources as they stream in, forwarding each to `stream_mode="custom"` consumers of the graph so they can
+    # start early (outside a graph run there is no stream to write to)
+    new_records = []
+    try:
+        writer = get_stream_writer()
+    except RuntimeError:
+        writer = lambda chunk: None
+    for record in stream_resources(state, qdrant, model):
+        writer({"resource": record})
+        new_records.append(record)
 
     # End timing and log
     end = time.perf_counter()
     print(f"\r\033[K::Vector database queried and sources summarized in {end - start:.2f}s")
 
-    return {"resource_summaries": new_summaries}
+    # Only new records/ids are returned; the state reducers append them. The executed plan is cleared so its query
+    # vectors aren't serialized again by every later checkpoint of the turn
+    return {
+        "resource_summaries": new_records,
+        "retrieved_ids": [r.id for r in new_records],
+        "search_plan": [],
+        "new_resources": len(new_records),
+    }
@@ -3,7 +3,9 @@ import time
 from langchain_core.messages import SystemMessage, HumanMessage
 from pydantic import BaseModel
 
-from ai.subgraphs.research_agent.model_config import MODEL_CONFIG
+from ai.prompts import PromptBuilder
+from ai.subgraphs.research_agent.latency import reasoning_effort
+from ai.subgraphs.research_agent.model_config import MODEL_CONFIG, PROMPT_CONFIG
 from ai.subgraphs.research_agent.schemas.graph_state import ResearchAgentState
 from dbs.query import QueryAndFilters
 
@@ -50,7 +52,7 @@ def write_queries(state: ResearchAgentState):
     conversation = state.get("conversation", {})
 
     # Construct prompt (system message and user message)
-    system_msg = SystemMessage(content=(
+    system_text = (
         "You are a semantic search assistant for philosophical research. Generate targeted search queries based on the "
         "user's last message and previous context. If multiple sources or authors are referenced in message, include "
         "at least one query per.\n\n"
@@ -59,18 +61,27 @@ def write_queries(state: ResearchAgentState):
         "- CRITICAL: Put author/source names in 'filters', NOT in the search query string\n\n"
         "Generate 1 query for simple questions, up to 3 for complex multi-faceted questions.\n\n"
         f"Output strictly as JSON. Here's an example:\n{SAMPLE_RESPONSE}\n"
-    ))
+    )
 
+    # Fit variable parts to the token cap (the conversation summary gives way first, the last message last)
     conv_summary = conversation.get("summarized_context", "No prior context.")
     last_message = conversation.get("last_user_message", "No last user message")
-    user_msg = HumanMessage(content=(
-        f"Conversation summary:\n{conv_summary}\n\n"
-        f"User's last message:\n{last_message}\n\n"
-        f"Previous queries feedback:\n{feedback}"
-    ))
+    prompt = PromptBuilder("write_queries", **PROMPT_CONFIG["write_queries"])
+    prompt.add("conv_summary", conv_summary, priority=0)
+    prompt.add("feedback", feedback, priority=1)
+    prompt.add("last_message", last_message, priority=2)
+    system_text, user_text = prompt.render(
+        system_text,
+        "Conversation summary:\n{conv_summary}\n\n"
+        "User's last message:\n{last_message}\n\n"
+        "Previous queries feedback:\n{feedback}"
+    )
+    system_msg = SystemMessage(content=system_text)
+    user_msg = HumanMessage(content=user_text)
 
     # Invoke LLM with structured output
-    result = structured_model.invoke([system_msg, user_msg], reasoning={"effort": "low"})
+    result = structured_model.invoke([system_msg, user_msg], reasoning={"effort": reasoning_effort(state, "low")})
+    prompt.record_output(result)
 
     # Stop timing and log
     end = time.perf_counter()
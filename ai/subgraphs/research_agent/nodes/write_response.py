@@ -3,8 +3,11 @@ import time
 from langchain_core.messages import SystemMessage, HumanMessage
 
 from ai.models.gpt import gpt_extract_content
-from ai.subgraphs.research_agent.model_config import MODEL_CONFIG
+from ai.prompts import PromptBuilder, TAIL
+from ai.subgraphs.research_agent.latency import reasoning_effort
+from ai.subgraphs.research_agent.model_config import MODEL_CONFIG, PROMPT_CONFIG
 from ai.subgraphs.research_agent.schemas.graph_state import ResearchAgentState
+from ai.subgraphs.research_agent.schemas.resource import render_resources, resource_priorities, resource_tokens
 
 
 def write_response(state: ResearchAgentState):
@@ -19,13 +22,24 @@ def write_response(state: ResearchAgentState):
     model = MODEL_CONFIG["write_response"]
 
     # Extract graph state variables
-    resource_summaries = state.get("resource_summaries", "No research resources collected yet.")
+    resources = state.get("resource_summaries") or []
     conversation = state.get("conversation", {})
     conv_summary = conversation.get("summarized_context", "No prior context needed.")
     last_message = conversation.get("last_user_message", "No last user message found")
 
+    # Fit variable parts to the token cap (conversation summary first, then the lowest-ranked resources; the user's
+    # message is only cut if it doesn't fit on its own)
+    prompt = PromptBuilder("write_response", **PROMPT_CONFIG["write_response"])
+    prompt.add("conv_summary", conv_summary, policy=TAIL, priority=0)
+    if resources:
+        prompt.add_items("resources", render_resources(resources), item_priorities=resource_priorities(resources),
+                         item_tokens=resource_tokens(resources), priority=1)
+    else:
+        prompt.add("resources", "No research resources collected yet.", priority=1)
+    prompt.add("last_message", last_message, priority=2)
+
     # Construct prompt (system message and user message)
-    system_msg = SystemMessage(content=(
+    system_text, user_text = prompt.render(
         "Respond to the user's last message given the following resources that you've 'researched'. Use specific "
         "quotes, respond in a conversational yet academic tone, and cite all sources at the end using this format: "
         "'(author last, author first; title)'. DO NOT reference or cite the summaries themselves, only the sources "
@@ -36,14 +50,16 @@ def write_response(state: ResearchAgentState):
         "- What resources are most relevant to the message/question?\n"
         "- What is the answer and how do the sources support it?\n"
         "- How can I best structure my response to be compact and direct yet with specific evidence?\n"
-        f"Here is a summary of the conversation previous to the user's message:\n{conv_summary}\n\n"
-        f"Here are the research resources you've gathered so far:\n{resource_summaries}"
-    ))
-
-    user_msg = HumanMessage(content=last_message)
+        "Here is a summary of the conversation previous to the user's message:\n{conv_summary}\n\n"
+        "Here are the research resources you've gathered so far:\n{resources}",
+        "{last_message}"
+    )
+    system_msg = SystemMessage(content=system_text)
+    user_msg = HumanMessage(content=user_text)
 
     # Invoke LLM and extract output
-    result = model.invoke([system_msg, user_msg], reasoning={"effort": "low"})
+    result = model.invoke([system_msg, user_msg], reasoning={"effort": reasoning_effort(state, "low")})
+    prompt.record_output(result)
     text = gpt_extract_content(result)  # Extract main response text
 
     # End timing and log
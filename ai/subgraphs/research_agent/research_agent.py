@@ -1,10 +1,13 @@
+import time
 from typing import Callable
 
 from langgraph.constants import START, END
 from langgraph.graph import StateGraph
 
-from ai.subgraphs.research_agent.nodes.assess_resources import assess_resources
+from ai.subgraphs.research_agent.latency import ITERATION_NODES, NodeTimer, remaining_budget
+from ai.subgraphs.research_agent.nodes.assess_resources import MAX_ITERATIONS, assess_resources
 from ai.subgraphs.research_agent.nodes.create_conversation import create_conversation
+from ai.subgraphs.research_agent.nodes.plan_queries import plan_queries
 from ai.subgraphs.research_agent.nodes.query_vector_db import query_vector_db
 from ai.subgraphs.research_agent.nodes.write_queries import write_queries
 from ai.subgraphs.research_agent.nodes.write_response import write_response
@@ -12,25 +15,55 @@ from ai.subgraphs.research_agent.schemas.graph_state import ResearchAgentState
 from dbs.postgres_filters import PostgresFilters
 from dbs.qdrant import Qdrant
 
+# Graph steps a run may take: create_conversation and write_response, every allowed iteration, plus some slack
+RECURSION_LIMIT = 2 + len(ITERATION_NODES) * MAX_ITERATIONS + 5
+
 
 class ResearchAgent:
     """Research Agent subgraph for querying vector DBs and summarizing results."""
 
     # --- Methods ---
-    def __init__(self, qdrant = None, postgres_filters = None):
-        """Initialize the Research Agent subgraph."""
+    def __init__(self, qdrant = None, postgres_filters = None, checkpointer = None):
+        """
+        Initialize the Research Agent subgraph.
+        `checkpointer` is any LangGraph checkpoint saver (e.g. `sqlite_checkpointer()`); with one, each thread's state
+        (rolling summary, retrieved point ids, resource records) persists between runs and processes.
+        """
 
         self.graph = None
-        self.qdrant = qdrant if qdrant is not None else Qdrant()
+        self.checkpointer = checkpointer
         self.postgres_filters = postgres_filters if postgres_filters is not None else PostgresFilters()
+        self.qdrant = qdrant if qdrant is not None else Qdrant(postgres_client=self.postgres_filters)
         self.resources = []
+        self.node_timer = NodeTimer()
+
+    def run(self, conversation: dict, latency_budget: float | None = None, thread_id: str | None = None) -> str:
+        """
+        Invoke the Research Agent subgraph with a conversation.
+        If `latency_budget` (seconds) is given, the research loop is cut short so the response is written in time.
+        With a checkpointer, `thread_id` selects the session to resume; only new messages need to be passed.
+        """
 
-    def run(self, conversation: dict) -> str:
-        """Invoke the Research Agent subgraph with a conversation."""
+        self._check_built("run")
+        if self.checkpointer is not None and thread_id is None:
+            raise ValueError("ResearchAgent.run() needs a thread_id when the agent has a checkpointer")
 
-        res = self.graph.invoke(conversation)
+        state = {**conversation, "latency_budget": latency_budget, "deadline": None}
+        if latency_budget is not None:
+            state["deadline"] = time.time() + latency_budget
+
+        res = self.graph.invoke(state, self._config(thread_id))
         return res.get('response', 'No response available')
 
+    def session(self, thread_id: str) -> dict:
+        """Stored state of a checkpointed session (empty if the thread is unknown or the agent has no checkpointer)."""
+
+        self._check_built("session")
+        if self.checkpointer is None:
+            return {}
+
+        return self.graph.get_state(self._config(thread_id)).values
+
     def build(self) -> None:
         """
         Build the Research Agent subgraph.
@@ -42,26 +75,29 @@ class ResearchAgent:
         g = StateGraph(ResearchAgentState)
 
         # --- Add nodes ---
-        g.add_node("create_conversation", create_conversation)
-        g.add_node("write_queries", write_queries)
-        g.add_node("query_vector_db", self._wrap(query_vector_db, self.qdrant))
-        g.add_node("assess_resources", assess_resources)
-        g.add_node("write_response", write_response)
+        g.add_node("create_conversation", self.node_timer.timed("create_conversation", create_conversation))
+        g.add_node("write_queries", self.node_timer.timed("write_queries", write_queries))
+        g.add_node("plan_queries", self.node_timer.timed("plan_queries", self._wrap(plan_queries, self.qdrant)))
+        g.add_node("query_vector_db", self.node_timer.timed("query_vector_db",
+                                                            self._wrap(query_vector_db, self.qdrant)))
+        g.add_node("assess_resources", self.node_timer.timed("assess_resources", assess_resources))
+        g.add_node("write_response", self.node_timer.timed("write_response", write_response))
 
         # --- Add edges ---
         g.add_edge(START, "create_conversation")
-        g.add_edge("create_conversation", "write_queries")
-        g.add_edge("write_queries", "query_vector_db")
+        g.add_edge("write_queries", "plan_queries")
         g.add_edge("query_vector_db", "assess_resources")
         g.add_edge("write_response", END)
 
         # --- Add conditional edges ---
+        g.add_conditional_edges("create_conversation", self._route_after_conversation)
         g.add_conditional_edges(
-            "assess_resources",
-            lambda state: "write_response" if state["query_satisfied"] else "write_queries"
+            "plan_queries",
+            lambda state: "query_vector_db" if state["search_plan"] else "write_response"   # nothing new to search
         )
+        g.add_conditional_edges("assess_resources", self._route_after_assessment)
 
-        self.graph = g.compile()
+        self.graph = g.compile(checkpointer=self.checkpointer)
 
     def close(self):
         """Close any database connections used by the Research Agent."""
@@ -69,6 +105,43 @@ class ResearchAgent:
         self.qdrant.close()
         self.postgres_filters.close()
 
+    def _check_built(self, method: str) -> None:
+        """Raise a clear error if the graph hasn't been built yet."""
+
+        if self.graph is None:
+            raise RuntimeError(f"ResearchAgent.build() must be called before {method}()")
+
+    @staticmethod
+    def _config(thread_id: str | None) -> dict:
+        """Run config selecting a checkpointed thread, if any, with room for every allowed research iteration."""
+
+        config = {"recursion_limit": RECURSION_LIMIT}
+        if thread_id is not None:
+            config["configurable"] = {"thread_id": thread_id}
+
+        return config
+
+    def _route_after_conversation(self, state: ResearchAgentState) -> str:
+        """Research unless even one iteration plus the response is predicted to overrun the latency budget."""
+
+        return "write_queries" if self._iteration_fits(state) else "write_response"
+
+    def _route_after_assessment(self, state: ResearchAgentState) -> str:
+        """Loop back for more research unless satisfied or another iteration would overrun the latency budget."""
+
+        if state["query_satisfied"] or not self._iteration_fits(state):
+            return "write_response"
+
+        return "write_queries"
+
+    def _iteration_fits(self, state: ResearchAgentState) -> bool:
+        """Whether one more research iteration plus the response is predicted to finish before the deadline."""
+
+        remaining = remaining_budget(state)
+        predicted = self.node_timer.predict_iteration() + self.node_timer.predict("write_response")
+
+        return remaining is None or remaining >= predicted
+
     @staticmethod
     def _wrap(func: Callable, *args, **kwargs) -> Callable:
         """Wrap a node so it receives `state` plus any extra args/kwargs."""
@@ -1,6 +1,39 @@
-from typing import TypedDict
+from typing import Annotated, TypedDict
 
 from ai.subgraphs.research_agent.schemas.conversation import Conversation
+from ai.subgraphs.research_agent.schemas.query_plan import ExecutedQuery, PlannedSearch
+from ai.subgraphs.research_agent.schemas.resource import ResourceRecord
+
+# Most recently retrieved point ids kept per thread
+MAX_RETRIEVED_IDS = 1000
+
+
+def append_records(existing: list | None, new: list | None) -> list:
+    """
+    Reducer that appends new records to a channel; an update of None clears it (used at the start of a turn).
+    Nodes only build and return their new records, but the channel value is still rebuilt as a new list of references
+    on every update: LangGraph shares channel values between copies and streamed snapshots, so they can't be extended
+    in place.
+    """
+
+    if new is None:
+        return []
+
+    return (existing or []) + new
+
+
+def merge_ids(existing: list | None, new: list) -> list:
+    """
+    Reducer that records retrieved ids in order of last retrieval (a re-retrieved id moves to the end), keeping only
+    the most recent `MAX_RETRIEVED_IDS` so the channel stays bounded over long threads.
+    """
+
+    merged = dict.fromkeys(existing or [])
+    for i in new:
+        merged.pop(i, None)
+        merged[i] = None
+
+    return list(merged)[-MAX_RETRIEVED_IDS:]
 
 
 class ResearchAgentState(TypedDict):
@@ -15,4 +48,13 @@ class ResearchAgentState(TypedDict):
     queries_feedback: str       # Feedback for research queries
     query_satisfied: bool       # If the query results were satisfactory
 
-    resource_summaries: list    # Recap summaries of the resources
+    search_plan: list[PlannedSearch]                                     # Searches to run next (cleared once run)
+    executed_queries: Annotated[list[ExecutedQuery], append_records]     # Queries already searched this turn
+
+    resource_summaries: Annotated[list[ResourceRecord], append_records]  # Summarized resources (append-only)
+    retrieved_ids: Annotated[list, merge_ids]                            # Most recent point ids retrieved in the thread
+    new_resources: int                                                   # Resources added by the last search round
+    iterations: int                                                      # Research iterations run this turn
+
+    latency_budget: float | None    # Wall-clock budget (seconds) for the whole run, None if unbounded
+    deadline: float | None          # Epoch time by which the response should be written
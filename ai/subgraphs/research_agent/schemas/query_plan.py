@@ -0,0 +1,20 @@
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
+class PlannedSearch:
+    """One vector search to run: all queries sharing the same canonical filters, merged into a single request."""
+
+    author: str | None          # Canonical (fuzzy-matched) author filter
+    source: str | None          # Canonical (fuzzy-matched) source filter
+    queries: list[str]          # Query texts merged into this search
+    vectors: list[list[float]]  # Query embeddings, one per query text
+
+
+@dataclass(slots=True, frozen=True)
+class ExecutedQuery:
+    """Compact record of a query already searched this turn, kept for near-duplicate detection."""
+
+    author: str | None          # Canonical author filter the query ran with
+    source: str | None          # Canonical source filter the query ran with
+    vector: bytes               # Normalized query embedding as float16 bytes
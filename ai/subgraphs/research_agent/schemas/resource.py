@@ -0,0 +1,37 @@
+from dataclasses import dataclass
+
+from ai.prompts import count_tokens
+
+
+@dataclass(slots=True, frozen=True)
+class ResourceRecord:
+    """Compact record of a retrieved and summarized research resource."""
+
+    id: int | str       # Qdrant point id
+    source: str         # Title of the source text
+    author: str         # Author of the source text
+    summary: str        # Summary of the retrieved text
+    tokens: int         # Token count of the summary
+    score: float        # Search score of the point (cosine similarity, or a fused rank score for merged searches)
+    rank: int = 0       # Rank among the results of each query in its search (0 = a query's best hit)
+
+
+def render_resources(records: list[ResourceRecord]) -> list[str]:
+    """Render resource records as numbered, cited prompt entries."""
+
+    return [f"[{i}] {r.author}, {r.source}\n{r.summary}" for i, r in enumerate(records, start=1)]
+
+
+def resource_priorities(records: list[ResourceRecord]) -> list[int]:
+    """
+    Prompt priorities of records, best first. Ranks are used rather than scores, which aren't comparable between
+    plain and fused searches.
+    """
+
+    return [-r.rank for r in records]
+
+
+def resource_tokens(records: list[ResourceRecord]) -> list[int]:
+    """Token counts of the rendered records, from the stored summary counts plus their citation lines."""
+
+    return [count_tokens(f"[{i}] {r.author}, {r.source}\n") + r.tokens for i, r in enumerate(records, start=1)]
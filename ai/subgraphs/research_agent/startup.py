@@ -0,0 +1,120 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from ai.prompts import count_tokens
+from ai.subgraphs.research_agent.model_config import MODEL_CONFIG
+from ai.subgraphs.research_agent.research_agent import ResearchAgent
+from dbs.postgres_filters import PostgresFilters
+from dbs.qdrant import Qdrant
+from embed.embed import Embeder
+
+
+class AgentStartup:
+    """
+    Start a Research Agent with its resources (embedding model, Qdrant client, Postgres filters) initialized
+    concurrently, optionally in the background, recording how long each startup phase took.
+    """
+
+    # --- Methods ---
+    def __init__(self, checkpointer = None, warmup: bool = False):
+        """Initialize the startup plan; nothing is loaded until `start()` is called."""
+
+        self.checkpointer = checkpointer
+        self.warmup = warmup
+        self.timings = {}
+        self._future = Future()
+        self._lock = threading.Lock()
+
+    def start(self, background: bool = True) -> "AgentStartup":
+        """Begin initialization, on a background thread unless `background` is False."""
+
+        if background:
+            threading.Thread(target=self._initialize, daemon=True).start()
+        else:
+            self._initialize()
+
+        return self
+
+    def agent(self) -> ResearchAgent:
+        """Wait until the agent is ready and return it (re-raises any startup error)."""
+
+        return self._future.result()
+
+    def ready(self) -> bool:
+        """Whether initialization has finished."""
+
+        return self._future.done()
+
+    def report(self) -> str:
+        """Startup-phase timing breakdown, slowest phase first."""
+
+        with self._lock:
+            phases = sorted(self.timings.items(), key=lambda item: item[1], reverse=True)
+
+        return "\n".join(f"::{phase:<18} {seconds:6.2f}s" for phase, seconds in phases)
+
+    def _timed(self, phase: str, func, *args, **kwargs):
+        """Run one startup phase and record its duration."""
+
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.timings[phase] = time.perf_counter() - start
+
+    def _initialize(self) -> None:
+        """Create all resources concurrently, build the graph and optionally warm it up."""
+
+        start = time.perf_counter()
+        embedder = client = postgres = None
+        try:
+            with ThreadPoolExecutor(max_workers=3) as pool:
+                embedder = pool.submit(self._timed, "embedder", Embeder)
+                client = pool.submit(self._timed, "qdrant_client", Qdrant.connect)
+                postgres = pool.submit(self._timed, "postgres_filters", PostgresFilters)
+
+                # The agent and Qdrant share one Postgres connection (and one filter scan)
+                qdrant = Qdrant(client=client.result(), postgres_client=postgres.result(), embedder=embedder.result())
+
+            agent = ResearchAgent(qdrant=qdrant, postgres_filters=qdrant.postgres_client,
+                                  checkpointer=self.checkpointer)
+            self._timed("graph_build", agent.build)
+
+            if self.warmup:
+                self._timed("warmup", self._warm_up, agent)
+
+            with self._lock:
+                self.timings["total"] = time.perf_counter() - start
+            self._future.set_result(agent)
+        except Exception as e:
+            self._close_opened(embedder, client, postgres)
+            self._future.set_exception(e)
+
+    @staticmethod
+    def _close_opened(*resources: Future | None) -> None:
+        """Close every resource whose startup phase completed (after another phase or a later step failed)."""
+
+        for resource in resources:
+            if resource is None or not resource.done() or resource.exception() is not None:
+                continue
+            try:
+                resource.result().close()
+            except Exception:
+                pass    # already failing; the original error is the one worth reporting
+
+    def _warm_up(self, agent: ResearchAgent) -> None:
+        """
+        Build model clients, load the prompt tokenizer, run an encode on every embedding worker and one search so the
+        first real query pays no setup cost.
+        """
+
+        with ThreadPoolExecutor() as pool:
+            tasks = [pool.submit(model.resolve) for model in MODEL_CONFIG.values() if hasattr(model, "resolve")]
+            tasks.append(pool.submit(count_tokens, "warm-up"))
+            agent.qdrant.embedder.warm()
+            vector = agent.qdrant.embedder.embed("warm-up")
+            agent.qdrant.client.query_points(collection_name=agent.qdrant.COLLECTION, query=vector, limit=1)
+            for task in tasks:
+                task.result()
@@ -0,0 +1 @@
+# Root conftest: lets pytest import the project packages (ai, dbs, embed, loadtest) from the repository root.
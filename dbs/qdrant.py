@@ -1,9 +1,12 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator
+
 from qdrant_client import QdrantClient, models
-from qdrant_client.http.models import MatchValue, FieldCondition, Filter
+from qdrant_client.http.models import MatchValue, FieldCondition, Filter, ScoredPoint
 from rapidfuzz import process
 
 from dbs.postgres_filters import PostgresFilters
-from dbs.query import QueryAndFilters
+from dbs.query import Filters
 from embed.embed import Embeder
 
 
@@ -14,141 +17,99 @@ class Qdrant:
     URL = "localhost"
     PORT = 6334
     COLLECTION = "philosophy"
+    LIMIT = 2           # Points retrieved per query
+    MAX_WORKERS = 3     # Concurrent searches when streaming results
 
     # --- Methods ---
-    def __init__(self):
-        """Initialize Qdrant database client."""
+    def __init__(self, client = None, postgres_client = None, embedder = None):
+        """Initialize Qdrant database client (already-created clients/embedder may be passed in to share them)."""
 
         # --- Initialize database clients ---
-        self.client = QdrantClient(url=self.URL, grpc_port=self.PORT, prefer_grpc=True)
-        self.postgres_client = PostgresFilters()
-        self.embedder = Embeder()
+        self.client = client if client is not None else self.connect()
+        self.postgres_client = postgres_client if postgres_client is not None else PostgresFilters()
+        self.embedder = embedder if embedder is not None else Embeder()
+
+    @classmethod
+    def connect(cls) -> QdrantClient:
+        """Create a client for the configured Qdrant server."""
+
+        return QdrantClient(url=cls.URL, grpc_port=cls.PORT, prefer_grpc=True)
 
     def close(self):
-        """Close Qdrant client connection."""
+        """Close Qdrant client connection and embedder workers."""
 
         self.client.close()
-
-    def query(self, query: QueryAndFilters) -> list[dict]:
-        """Query the Qdrant vector database with fuzzy-matched filters."""
-
-        res = []
-        seen_ids = set()
-
-        all_authors = self.postgres_client.all_authors
-        all_sources = self.postgres_client.all_sources
-
-        vector = self.embedder.embed(query.query)
-        filters = query.filters
-
-        # Build filter conditions
-        _filter_conditions = []
-        if filters is not None:
-            author = filters.author
-            source_title = filters.source_title
-
-            # Fuzzy match author
-            if author is not None:
-                best_author = process.extractOne(author, all_authors)
-                if best_author:
-                    _filter_conditions.append(
-                        FieldCondition(key="author", match=MatchValue(value=best_author[0]))
-                    )
-
-            # Fuzzy match source
-            if source_title is not None:
-                best_source = process.extractOne(source_title, all_sources)
-                if best_source:
-                    _filter_conditions.append(
-                        FieldCondition(key="source", match=MatchValue(value=best_source[0]))
-                    )
-
-        # Build filter only if we have conditions
-        _filter = Filter(must=_filter_conditions) if _filter_conditions else None
-
-        # Query vector database
-        results = self.client.query_points(
-            collection_name=self.COLLECTION,
-            query=vector,
-            limit=2,
-            query_filter=_filter
-        )
-
-        # Deduplicate points and add to resources
-        for point in results.points:
-            if point.id not in seen_ids:
-                seen_ids.add(point.id)
-                res.append(point.payload)
-
-        return res
-
-    def batch_query(self, queries: list[QueryAndFilters]):
-        """Batch query Qdrant with per-query fuzzy filters."""
-
-        all_authors, all_sources = self.postgres_client.all_authors, self.postgres_client.all_sources
-
-        # --- Batch embed all query texts ---
-        query_texts = [q.query for q in queries]
-        vectors = self.embedder.embed_batch(query_texts)
-
-        # --- Build SearchRequest list ---
-        search_requests = []
-
-        for q, vector in zip(queries, vectors):
-            filter_obj = None
-
-            if q.filters:
-                conditions = []
-                f = q.filters
-
-                # fuzzy match author
-                if f.author:
-                    best_author = process.extractOne(f.author, all_authors)
-                    if best_author:
-                        conditions.append(
-                            FieldCondition(
-                                key="author",
-                                match=MatchValue(value=best_author[0])
-                            )
-                        )
-
-                # fuzzy match source
-                if f.source_title:
-                    best_source = process.extractOne(f.source_title, all_sources)
-                    if best_source:
-                        conditions.append(
-                            FieldCondition(
-                                key="source",
-                                match=MatchValue(value=best_source[0])
-                            )
-                        )
-
-                if conditions:
-                    filter_obj = Filter(must=conditions)
-
-            # Add search request
-            search_requests.append(
-                models.QueryRequest(
-                    query=vector,
-                    limit=2,
-                    filter=filter_obj,
+        self.embedder.close()
+
+    def canonical_filters(self, filters: Filters | None) -> tuple[str | None, str | None]:
+        """Fuzzy-match a query's filters to the stored `(author, source)` names (None where absent/unmatched)."""
+
+        return self._match_filters(filters, self.postgres_client.all_authors, self.postgres_client.all_sources)
+
+    def stream_plan(self, plan: list) -> Iterator[tuple[int, list[ScoredPoint]]]:
+        """
+        Run planned searches (see `plan_queries`), yielding `(search index, points)` as soon as each finishes.
+        A search that merges several queries sends them as prefetches of one request and fuses them with reciprocal
+        rank fusion, retrieving `LIMIT` points per merged query.
+        """
+
+        def search(planned):
+            query_filter = self._exact_filter(planned.author, planned.source)
+            if len(planned.vectors) == 1:
+                return self.client.query_points(
+                    collection_name=self.COLLECTION,
+                    query=planned.vectors[0],
+                    limit=self.LIMIT,
+                    query_filter=query_filter,
                     with_payload=True,
-                    with_vector=False
+                    with_vectors=False
                 )
+
+            return self.client.query_points(
+                collection_name=self.COLLECTION,
+                prefetch=[models.Prefetch(query=v, filter=query_filter, limit=self.LIMIT) for v in planned.vectors],
+                query=models.FusionQuery(fusion=models.Fusion.RRF),
+                limit=self.LIMIT * len(planned.vectors),
+                with_payload=True,
+                with_vectors=False
             )
 
-        # --- Execute all queries in a single batch ---
-        batch_results = self.client.query_batch_points(
-            collection_name=self.COLLECTION,
-            requests=search_requests
-        )
-
-        # --- Convert Qdrant results into your desired payload lists ---
-        seen_ids, results_out = set(), []
-        for response in batch_results:
-            for point in response.points:
-                if point.id not in seen_ids:
-                    seen_ids.add(point.id)
-                    results_out.append(point.payload)
-
-        return results_out
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+            future_to_index = {executor.submit(search, planned): i for i, planned in enumerate(plan)}
+            for future in as_completed(future_to_index):
+                yield future_to_index[future], future.result().points
+
+    @staticmethod
+    def _match_filters(filters: Filters | None, all_authors: list[str],
+                       all_sources: list[str]) -> tuple[str | None, str | None]:
+        """Fuzzy-match author/source filters against the known names."""
+
+        author = source = None
+        if not filters:
+            return author, source
+
+        # fuzzy match author
+        if filters.author:
+            best_author = process.extractOne(filters.author, all_authors)
+            if best_author:
+                author = best_author[0]
+
+        # fuzzy match source
+        if filters.source_title:
+            best_source = process.extractOne(filters.source_title, all_sources)
+            if best_source:
+                source = best_source[0]
+
+        return author, source
+
+    @staticmethod
+    def _exact_filter(author: str | None, source: str | None) -> Filter | None:
+        """Build a Qdrant filter on exact author/source names, or None if neither is set."""
+
+        conditions = []
+        if author is not None:
+            conditions.append(FieldCondition(key="author", match=MatchValue(value=author)))
+        if source is not None:
+            conditions.append(FieldCondition(key="source", match=MatchValue(value=source)))
+
+        return Filter(must=conditions) if conditions else None
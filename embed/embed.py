@@ -1,24 +1,55 @@
+from concurrent.futures import Future
+
 import numpy as np
 from numpy import float32
-from sentence_transformers import SentenceTransformer
+
+from embed.pool import EmbeddingPool
 
 
 class Embeder:
     """Embedder using BAAI/bge-large-en-v1.5 model."""
 
     # --- Constants ---
+    MODEL = "BAAI/bge-large-en-v1.5"
     DEVICE = "cuda"
+    WORKERS = 0     # CPU worker processes to shard encoding across (0 encodes in-process on DEVICE)
 
     # --- Methods ---
-    def __init__(self):
-        """Initialize the BAAI/bge-large-en-v1.5 model for embedding."""
+    def __init__(self, workers: int | None = None):
+        """Initialize the BAAI/bge-large-en-v1.5 model for embedding, in-process or in a CPU worker pool."""
+
+        workers = self.WORKERS if workers is None else workers
+
+        self.model = None
+        self.pool = None
+        if workers > 0:
+            self.pool = EmbeddingPool(self.MODEL, workers)
+        else:
+            # Imported here so torch is only loaded when an in-process model is actually needed
+            from sentence_transformers import SentenceTransformer
+
+            self.model = SentenceTransformer(self.MODEL, device=self.DEVICE)
+
+    def close(self):
+        """Shut down the worker pool, if any."""
+
+        if self.pool is not None:
+            self.pool.close()
 
-        self.model = SentenceTransformer("BAAI/bge-large-en-v1.5", device=self.DEVICE)
+    def warm(self) -> None:
+        """Run a first encode on every worker (or on the in-process model), so real queries pay no setup cost."""
 
+        if self.pool is not None:
+            self.pool.warm()
+        else:
+            self.embed("warm-up")
 
     def embed(self, text: str):
         """Embed text into a dense vector using BAAI/bge-large-en-v1.5."""
 
+        if self.pool is not None:
+            return self.pool.encode([text])[0]
+
         # Model expects a list of sentences
         vector = self.model.encode([text], normalize_embeddings=True)
 
@@ -27,6 +58,26 @@ class Embeder:
     def embed_batch(self, texts: list[str]):
         """Embed a list of texts into dense vectors using BAAI/bge-large-en-v1.5."""
 
+        if self.pool is not None:
+            return self.pool.encode(texts)
+
         vectors = self.model.encode(texts, normalize_embeddings=True)
 
-        return [np.array(vec, dtype=float32).ravel().tolist() for vec in vectors]
\ No newline at end of file
+        return [np.array(vec, dtype=float32).ravel().tolist() for vec in vectors]
+
+    def submit_batch(self, texts: list[str]) -> Future:
+        """
+        Start embedding `texts` and return a future of their vectors, so the caller can do other work meanwhile.
+        Only a worker pool encodes in the background; an in-process model encodes before returning.
+        """
+
+        if self.pool is not None:
+            return self.pool.submit(texts)
+
+        future = Future()
+        try:
+            future.set_result(self.embed_batch(texts) if texts else [])
+        except Exception as e:
+            future.set_exception(e)
+
+        return future
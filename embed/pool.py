@@ -0,0 +1,165 @@
+import multiprocessing as mp
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import numpy as np
+from numpy import float32
+
+# Model loaded by each worker and the barrier all workers share (set by the pool initializer)
+_worker_model = None
+_worker_barrier = None
+
+# Seconds a worker waits for the others at a barrier before giving up
+BARRIER_TIMEOUT = 600
+
+
+def _export_weights(model_name: str, weights_path: str) -> None:
+    """Save the model's weights as a single flat file that workers can memory-map."""
+
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    # Written under a temporary name and renamed into place, so a worker never maps a half-written file
+    model = SentenceTransformer(model_name, device="cpu")
+    tmp_path = f"{weights_path}.{os.getpid()}.tmp"
+    torch.save(model.state_dict(), tmp_path)
+    os.replace(tmp_path, weights_path)
+
+
+def _init_worker(model_name: str, weights_path: str, core_sets, load_lock, barrier) -> None:
+    """Pin the worker to its own cores and load the model with weights shared through a memory-mapped file."""
+
+    global _worker_model, _worker_barrier
+
+    # Each worker takes the next free core set so workers don't fight over the same cores
+    cores = core_sets.get()
+    if cores and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    torch.set_num_threads(max(1, len(cores)))
+
+    # Building the model materializes a private copy of the weights before it is swapped for tensors backed by the
+    # shared file (page cache is shared between workers), so workers load one at a time: peak memory stays at one
+    # private copy instead of one per worker
+    with load_lock:
+        model = SentenceTransformer(model_name, device="cpu")
+        model.load_state_dict(torch.load(weights_path, mmap=True, weights_only=True), assign=True)
+        model.eval()
+
+    _worker_model = model
+    _worker_barrier = barrier
+
+
+def _ready() -> None:
+    """Wait until every worker has loaded its model (one call per worker, so each call lands on a different one)."""
+
+    _worker_barrier.wait(BARRIER_TIMEOUT)
+
+
+def _warm() -> None:
+    """Run one encode on this worker once every worker is ready."""
+
+    _worker_barrier.wait(BARRIER_TIMEOUT)
+    _worker_model.encode(["warm-up"], normalize_embeddings=True)
+
+
+def _encode(texts: list[str]):
+    """Encode a shard of texts in a worker process."""
+
+    return _worker_model.encode(texts, normalize_embeddings=True).astype(float32)
+
+
+class EmbeddingPool:
+    """Pool of CPU worker processes that each hold one copy of the embedding model (weights shared via mmap)."""
+
+    # --- Constants ---
+    CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "cogito", "embed")
+
+    # --- Methods ---
+    def __init__(self, model_name: str, workers: int):
+        """Start `workers` processes, each pinned to a disjoint set of the available cores."""
+
+        ctx = mp.get_context("spawn")  # forking a process that may already hold torch threads is unsafe
+
+        # Export the weights once to a file shared by all workers (config and tokenizer come from the model cache)
+        weights_path = os.path.join(self.CACHE_DIR, f"{model_name.replace('/', '__')}.pt")
+        if not os.path.exists(weights_path):
+            os.makedirs(self.CACHE_DIR, exist_ok=True)
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as exporter:
+                exporter.submit(_export_weights, model_name, weights_path).result()
+
+        # Split available cores into one contiguous set per worker
+        available = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else []
+        core_sets = ctx.Queue()
+        per_worker = len(available) // workers
+        for i in range(workers):
+            core_sets.put(set(available[i * per_worker:(i + 1) * per_worker]))
+
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(model_name, weights_path, core_sets, ctx.Lock(), ctx.Barrier(workers))
+        )
+
+        # Processes are otherwise only started (and models loaded) as work arrives, so the first queries would pay
+        # for loading; start every worker now and wait until all of them are ready
+        self._on_every_worker(_ready)
+
+    def warm(self) -> None:
+        """Run one encode on every worker."""
+
+        self._on_every_worker(_warm)
+
+    def close(self) -> None:
+        """Shut down the worker processes."""
+
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    def submit(self, texts: list[str]) -> Future:
+        """Shard `texts` across workers; the returned future resolves to vectors in the same order as `texts`."""
+
+        result = Future()
+        if not texts:
+            result.set_result([])
+            return result
+
+        # Contiguous shards keep reassembly a simple concatenation
+        n = min(self.workers, len(texts))
+        size = -(-len(texts) // n)
+        shards = [self.executor.submit(_encode, texts[i:i + size]) for i in range(0, len(texts), size)]
+
+        pending = [len(shards)]
+        lock = threading.Lock()
+
+        def on_done(_):
+            with lock:
+                pending[0] -= 1
+                if pending[0]:
+                    return
+            try:
+                vectors = np.concatenate([s.result() for s in shards])
+                result.set_result([vec.ravel().tolist() for vec in vectors])
+            except Exception as e:
+                result.set_exception(e)
+
+        for shard in shards:
+            shard.add_done_callback(on_done)
+
+        return result
+
+    def encode(self, texts: list[str]) -> list[list[float]]:
+        """Encode `texts` across workers and wait for the result."""
+
+        return self.submit(texts).result()
+
+    def _on_every_worker(self, func) -> None:
+        """Run `func` once on each worker (it must wait on the shared barrier so no worker can take two calls)."""
+
+        for future in [self.executor.submit(func) for _ in range(self.workers)]:
+            future.result()
@@ -0,0 +1,136 @@
+import resource
+import threading
+import time
+from collections import Counter
+
+
+def rss_mb() -> float:
+    """Current resident set size of this process in MB (peak RSS if /proc is unavailable)."""
+
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize() / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Nearest-rank percentile of `values` (0 if empty)."""
+
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+def rss_slope(samples: list[tuple[float, float]]) -> float:
+    """Least-squares slope of `(elapsed seconds, RSS MB)` samples, in MB per hour."""
+
+    if len(samples) < 2:
+        return 0.0
+
+    n = len(samples)
+    mean_t = sum(t for t, _ in samples) / n
+    mean_m = sum(m for _, m in samples) / n
+    var_t = sum((t - mean_t) ** 2 for t, _ in samples)
+    if var_t == 0:
+        return 0.0
+
+    return sum((t - mean_t) * (m - mean_m) for t, m in samples) / var_t * 3600
+
+
+class LoadMetrics:
+    """Thread-safe collector of per-turn latencies and errors, reported in time windows."""
+
+    # --- Methods ---
+    def __init__(self):
+        """Start the clock and take the baseline RSS sample."""
+
+        self.start = time.perf_counter()
+        self.rss_start = rss_mb()
+        self.completed = 0
+        self.errors = Counter()
+        self.windows = []
+        self.rss_samples = [(0.0, self.rss_start)]
+        self._latencies = []
+        self._window_errors = 0
+        self._stage_totals = {}
+        self._lock = threading.Lock()
+
+    def record(self, latency: float) -> None:
+        """Record a successful turn."""
+
+        with self._lock:
+            self.completed += 1
+            self._latencies.append(latency)
+
+    def record_error(self, error: Exception) -> None:
+        """Record a failed turn."""
+
+        with self._lock:
+            self.errors[type(error).__name__] += 1
+            self._window_errors += 1
+
+    def close_window(self, stage_totals: dict | None = None) -> dict:
+        """
+        Summarize the turns recorded since the last window and start a new one.
+        `stage_totals` maps stage names (graph nodes, waits) to cumulative `(count, seconds)`; the window reports each
+        stage's mean time over the runs since the previous window.
+        """
+
+        with self._lock:
+            latencies, self._latencies = self._latencies, []
+            errors, self._window_errors = self._window_errors, 0
+
+        elapsed = time.perf_counter() - self.start
+        since = self.windows[-1]["elapsed"] if self.windows else 0.0
+        rss = rss_mb()
+        self.rss_samples.append((elapsed, rss))
+
+        total = len(latencies) + errors
+        window = {
+            "elapsed": elapsed,
+            "turns": len(latencies),
+            "throughput": len(latencies) / (elapsed - since) if elapsed > since else 0.0,
+            "p50": percentile(latencies, 50),
+            "p90": percentile(latencies, 90),
+            "p99": percentile(latencies, 99),
+            "error_rate": errors / total if total else 0.0,
+            "rss_mb": rss,
+            "rss_growth_mb": rss - self.rss_start,
+            "stages": self._stage_means(stage_totals or {}),
+        }
+        self.windows.append(window)
+
+        return window
+
+    def _stage_means(self, stage_totals: dict) -> dict:
+        """Mean seconds per stage run since the previous window."""
+
+        means = {}
+        for stage, (count, seconds) in stage_totals.items():
+            previous_count, previous_seconds = self._stage_totals.get(stage, (0, 0.0))
+            if count > previous_count:
+                means[stage] = (seconds - previous_seconds) / (count - previous_count)
+        self._stage_totals = dict(stage_totals)
+
+        return means
+
+    def summary(self, warmup_fraction: float = 0.1) -> dict:
+        """Overall results; the RSS trend ignores the first `warmup_fraction` of samples (caches filling up)."""
+
+        samples = self.rss_samples[int(len(self.rss_samples) * warmup_fraction):]
+        elapsed = time.perf_counter() - self.start
+        failed = sum(self.errors.values())
+
+        return {
+            "elapsed": elapsed,
+            "completed": self.completed,
+            "throughput": self.completed / elapsed if elapsed else 0.0,
+            "error_rate": failed / (self.completed + failed) if self.completed + failed else 0.0,
+            "errors": dict(self.errors),
+            "rss_growth_mb": rss_mb() - self.rss_start,
+            "rss_slope_mb_per_hour": rss_slope(samples),
+        }
@@ -0,0 +1,178 @@
+import argparse
+import contextlib
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+
+from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
+
+from ai.subgraphs.research_agent.latency import WAIT_STATS
+from ai.subgraphs.research_agent.research_agent import ResearchAgent
+from loadtest.metrics import LoadMetrics
+from loadtest.stubs import StubQdrant, StubPostgresFilters, install_stub_models
+
+# Questions the simulated users ask
+QUESTIONS = [
+    "What does Aristotle mean by virtue being a mean between extremes?",
+    "How does Kant distinguish hypothetical from categorical imperatives?",
+    "What is Plato's argument for the immortality of the soul in the Phaedo?",
+    "How does Mill answer the objection that utilitarianism is a doctrine worthy of swine?",
+    "What role does the state of nature play in Hobbes' Leviathan?",
+]
+
+
+def parse_duration(text: str) -> float:
+    """Parse durations like '90', '30s', '10m' or '4h' into seconds."""
+
+    units = {"s": 1, "m": 60, "h": 3600}
+    if text[-1] in units:
+        return float(text[:-1]) * units[text[-1]]
+
+    return float(text)
+
+
+def conversation_worker(agent: ResearchAgent, metrics: LoadMetrics, stop: threading.Event, args) -> None:
+    """Simulate one user: ask questions with think-time in between, starting a new conversation every few turns."""
+
+    while not stop.is_set():
+        thread_id = str(uuid.uuid4())
+        conversation = {"messages": [SystemMessage(content="You are a helpful philosophical research assistant.")]}
+
+        for _ in range(args.turns):
+            if stop.wait(random.expovariate(1 / args.think_time) if args.think_time > 0 else 0):
+                return
+
+            # Checkpointed sessions only need the new message
+            if args.checkpoint_db:
+                del conversation["messages"][1:]
+            conversation["messages"].append(HumanMessage(content=random.choice(QUESTIONS)))
+
+            start = time.perf_counter()
+            try:
+                output = agent.run(conversation, args.latency_budget, thread_id)
+            except Exception as e:
+                metrics.record_error(e)
+                conversation["messages"].pop()     # no reply, so don't send two user messages in a row next turn
+                continue
+            metrics.record(time.perf_counter() - start)
+
+            conversation["messages"].append(AIMessage(content=output))
+
+
+def stage_totals(agent: ResearchAgent) -> dict:
+    """
+    Cumulative `(count, seconds)` per graph node plus waits on shared resources. Summary-pool queueing (thread-pool
+    saturation) and embedder waits (embedding contention) are reported apart from the nodes that contain them.
+    """
+
+    waits = {f"wait:{resource}": totals for resource, totals in WAIT_STATS.totals().items()}
+    return {**agent.node_timer.totals(), **waits}
+
+
+def build_agent(args) -> ResearchAgent:
+    """Build a research agent on stand-in or real backends."""
+
+    checkpointer = None
+    if args.checkpoint_db:
+        from ai.subgraphs.research_agent.checkpoint import sqlite_checkpointer
+        checkpointer = sqlite_checkpointer(args.checkpoint_db)
+
+    if args.backends == "real":
+        agent = ResearchAgent(checkpointer=checkpointer)
+    else:
+        install_stub_models(args.model_latency, args.insufficient_rate)
+
+        embedder = None
+        if args.real_embedder:
+            from embed.embed import Embeder
+            embedder = Embeder()
+
+        qdrant = StubQdrant(latency=args.search_latency, embedder=embedder)
+        agent = ResearchAgent(qdrant=qdrant, postgres_filters=StubPostgresFilters(), checkpointer=checkpointer)
+
+    agent.build()
+    return agent
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent load generator and soak test for ResearchAgent")
+    parser.add_argument("--workers", type=int, default=50, help="Concurrent simulated users")
+    parser.add_argument("--duration", default="5m", help="How long to run, e.g. 300, 10m, 4h")
+    parser.add_argument("--soak", action="store_true",
+                        help="Soak mode: default to a 4h run with 60s windows and fail if RSS keeps growing")
+    parser.add_argument("--report-interval", type=float, default=None, help="Seconds per report window")
+    parser.add_argument("--think-time", type=float, default=2.0, help="Mean think-time between turns (seconds)")
+    parser.add_argument("--turns", type=int, default=5, help="Turns per conversation before starting a new one")
+    parser.add_argument("--latency-budget", type=float, default=None, help="Latency budget passed to each run")
+    parser.add_argument("--backends", choices=["stub", "real"], default="stub",
+                        help="'stub' uses stand-in models/Qdrant/Postgres, 'real' uses the configured services")
+    parser.add_argument("--model-latency", type=float, default=0.5, help="Mean stub model latency (seconds)")
+    parser.add_argument("--search-latency", type=float, default=0.1, help="Mean stub search latency (seconds)")
+    parser.add_argument("--insufficient-rate", type=float, default=0.3,
+                        help="Probability the stub classifier asks for more research")
+    parser.add_argument("--real-embedder", action="store_true", help="Embed queries with the real shared Embeder")
+    parser.add_argument("--checkpoint-db", default=None, help="Run with a SQLite checkpointer at this path")
+    parser.add_argument("--leak-threshold", type=float, default=50.0,
+                        help="RSS growth (MB/hour) above which a soak run is reported as leaking")
+    args = parser.parse_args()
+
+    duration = parse_duration("4h" if args.soak and args.duration == "5m" else args.duration)
+    interval = args.report_interval or (60.0 if args.soak else 10.0)
+    out = sys.stderr
+
+    agent = build_agent(args)
+    metrics = LoadMetrics()
+    stop = threading.Event()
+
+    print(f"Running {args.workers} workers for {duration:.0f}s against {args.backends} backends", file=out)
+    print(f"{'elapsed':>8} {'turns':>6} {'turn/s':>7} {'p50':>7} {'p90':>7} {'p99':>7} {'err%':>6} "
+          f"{'rss MB':>8} {'growth':>7}", file=out)
+
+    # Node progress lines are noise with many concurrent runs
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        workers = [
+            threading.Thread(target=conversation_worker, args=(agent, metrics, stop, args), daemon=True)
+            for _ in range(args.workers)
+        ]
+        for w in workers:
+            w.start()
+
+        try:
+            deadline = time.perf_counter() + duration
+            while not stop.wait(min(interval, max(0.0, deadline - time.perf_counter()))):
+                window = metrics.close_window(stage_totals(agent))
+                print(f"{window['elapsed']:8.0f} {window['turns']:6d} {window['throughput']:7.2f} "
+                      f"{window['p50']:7.2f} {window['p90']:7.2f} {window['p99']:7.2f} {window['error_rate']:6.1%} "
+                      f"{window['rss_mb']:8.1f} {window['rss_growth_mb']:+7.1f}", file=out)
+                if window["stages"]:
+                    print("         " + "  ".join(f"{stage} {seconds:.2f}s"
+                                                  for stage, seconds in window["stages"].items()), file=out)
+                if time.perf_counter() >= deadline:
+                    break
+        except KeyboardInterrupt:
+            pass
+        finally:
+            stop.set()
+            for w in workers:
+                w.join()
+
+    agent.close()
+
+    # --- Summary ---
+    s = metrics.summary()
+    print(f"\nCompleted {s['completed']} turns in {s['elapsed']:.0f}s ({s['throughput']:.2f} turn/s), "
+          f"error rate {s['error_rate']:.1%}", file=out)
+    for name, count in s["errors"].items():
+        print(f"  {name}: {count}", file=out)
+    print(f"RSS growth {s['rss_growth_mb']:+.1f} MB, trend {s['rss_slope_mb_per_hour']:+.1f} MB/h", file=out)
+
+    if args.soak and s["rss_slope_mb_per_hour"] > args.leak_threshold:
+        print(f"Possible leak: RSS trend exceeds {args.leak_threshold:.0f} MB/h", file=out)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import random
+import time
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+from langchain_core.messages import AIMessage
+
+from ai.subgraphs.research_agent.model_config import MODEL_CONFIG
+
+# Words used to build stand-in resource text
+WORDS = ("virtue", "reason", "duty", "happiness", "justice", "soul", "form", "good", "will", "nature", "knowledge",
+         "truth", "being", "mind", "freedom", "law", "habit", "pleasure", "city", "friendship")
+
+
+def _sleep(latency: float) -> None:
+    """Sleep for a jittered amount of time around `latency` seconds."""
+
+    if latency > 0:
+        time.sleep(random.uniform(0.5, 1.5) * latency)
+
+
+class StubChatModel:
+    """Stand-in chat model with configurable latency; replies come from `reply(messages) -> str`."""
+
+    # --- Methods ---
+    def __init__(self, reply, latency: float = 0.5, structured: dict | None = None):
+        """Initialize the stub with a reply function, mean latency and payload for structured output."""
+
+        self.reply = reply
+        self.latency = latency
+        self.structured = structured
+
+    def invoke(self, messages, **kwargs):
+        """Wait, then reply like a chat model."""
+
+        _sleep(self.latency)
+        return AIMessage(content=self.reply(messages))
+
+    def with_structured_output(self, schema):
+        """Return a model whose replies are `schema` instances built from the structured payload."""
+
+        stub = self
+
+        class Structured:
+            def invoke(self, messages, **kwargs):
+                _sleep(stub.latency)
+                return schema.model_validate(stub.structured)
+
+        return Structured()
+
+
+class StubEmbedder:
+    """Stand-in for `Embeder` returning deterministic pseudo-random unit vectors (identical texts embed the same)."""
+
+    # --- Constants ---
+    DIMENSIONS = 64
+
+    # --- Methods ---
+    def embed_batch(self, texts: list[str]):
+        """Embed each text as a unit vector seeded by the text."""
+
+        vectors = []
+        for text in texts:
+            rng = random.Random(text)
+            vector = [rng.gauss(0, 1) for _ in range(self.DIMENSIONS)]
+            norm = sum(v * v for v in vector) ** 0.5
+            vectors.append([v / norm for v in vector])
+
+        return vectors
+
+    def submit_batch(self, texts: list[str]) -> Future:
+        """Embed `texts` and return them as a completed future, like `Embeder.submit_batch` without a pool."""
+
+        future = Future()
+        future.set_result(self.embed_batch(texts))
+        return future
+
+    def close(self):
+        pass
+
+
+class StubQdrant:
+    """Stand-in for `Qdrant` that returns random points from a fixed-size synthetic corpus."""
+
+    # --- Constants ---
+    LIMIT = 2
+
+    # --- Methods ---
+    def __init__(self, latency: float = 0.1, corpus_size: int = 1000, embedder=None):
+        """Initialize the stub; pass a real `Embeder` to have queries really embedded (to exercise contention)."""
+
+        self.latency = latency
+        self.corpus_size = corpus_size
+        self.embedder = embedder if embedder is not None else StubEmbedder()
+
+    def close(self):
+        """Close the embedder."""
+
+        self.embedder.close()
+
+    def canonical_filters(self, filters):
+        """Use filters as given (there is no metadata to fuzzy-match against)."""
+
+        if not filters:
+            return None, None
+
+        return filters.author, filters.source_title
+
+    def stream_plan(self, plan):
+        """Yield `(search index, points)` for each planned search, like `Qdrant.stream_plan`."""
+
+        for i, planned in enumerate(plan):
+            _sleep(self.latency)
+            yield i, [self._point() for _ in range(self.LIMIT * len(planned.vectors))]
+
+    def _point(self):
+        """A random point from the synthetic corpus."""
+
+        point_id = random.randrange(self.corpus_size)
+        rng = random.Random(point_id)
+        return SimpleNamespace(
+            id=point_id,
+            score=random.random(),
+            payload={
+                "text": " ".join(rng.choice(WORDS) for _ in range(200)),
+                "author": f"Author {point_id % 50}",
+                "source": f"Source {point_id % 200}",
+            }
+        )
+
+
+class StubPostgresFilters:
+    """Stand-in for `PostgresFilters` (the agent only closes it)."""
+
+    def close(self):
+        pass
+
+
+def install_stub_models(latency: float, insufficient_rate: float) -> None:
+    """
+    Replace every configured node model with a stub.
+    The resource classifier answers 'No' with probability `insufficient_rate`, so the research loop is exercised.
+    """
+
+    queries = {"queries": [
+        {"query": "What is virtue?"},
+        {"query": "Is virtue a habit?", "filters": {"author": "Aristotle"}},
+    ]}
+    text = " ".join(WORDS)
+
+    for node in MODEL_CONFIG:
+        MODEL_CONFIG[node] = StubChatModel(lambda messages: text, latency, structured=queries)
+
+    MODEL_CONFIG["assess_resources_classifier"] = StubChatModel(
+        lambda messages: "No" if random.random() < insufficient_rate else "Yes", latency
+    )
@@ -1,8 +1,14 @@
+import argparse
 import time
+import uuid
 
 from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
 
-from ai.subgraphs.research_agent.research_agent import ResearchAgent
+from ai.prompts import PROMPT_STATS
+from ai.subgraphs.research_agent.checkpoint import sqlite_checkpointer
+from ai.subgraphs.research_agent.model_config import cascade_stats
+from ai.subgraphs.research_agent.nodes.plan_queries import PLANNER_STATS
+from ai.subgraphs.research_agent.startup import AgentStartup
 
 START_TEXT = \
 r"""
@@ -38,6 +44,19 @@ Type 'exit' or 'quit' to end the conversation.
 if __name__ == "__main__":
     # Main entry point for running the Cogito AI research assistant in a console loop.
 
+    # Parse command line options
+    parser = argparse.ArgumentParser(description="Cogito AI research assistant")
+    parser.add_argument("--latency-budget", type=float, default=None,
+                        help="Wall-clock budget in seconds per response (research is cut short to meet it)")
+    parser.add_argument("--checkpoint-db", default=None,
+                        help="SQLite file to persist sessions in (enables resuming with --thread-id)")
+    parser.add_argument("--thread-id", default=None, help="Session to resume (a new one is created if omitted)")
+    parser.add_argument("--background-start", action="store_true",
+                        help="Show the prompt right away and finish loading the agent in the background")
+    parser.add_argument("--warmup", action="store_true",
+                        help="Load model clients/tokenizer and run a warm-up embedding/search during startup")
+    args = parser.parse_args()
+
     print(START_TEXT)
 
     # Conversation setup
@@ -47,9 +66,18 @@ if __name__ == "__main__":
         ]
     }
 
-    # Build agent
-    agent = ResearchAgent()
-    agent.build()
+    # Build agent, loading its resources concurrently (checkpointed sessions resume from their stored state)
+    checkpointer = sqlite_checkpointer(args.checkpoint_db) if args.checkpoint_db else None
+    thread_id = args.thread_id or str(uuid.uuid4())
+    startup = AgentStartup(checkpointer=checkpointer, warmup=args.warmup).start(background=args.background_start)
+    agent = None
+
+    if not args.background_start:
+        agent = startup.agent()
+        print(f"Agent ready:\n{startup.report()}\n")
+
+    if checkpointer is not None:
+        print(f"Session: {thread_id} (resume with --thread-id {thread_id})\n")
 
     # Main loop
     while True:
@@ -57,13 +85,22 @@ if __name__ == "__main__":
         user_input = input("[User]: ")
         if user_input.lower() in {"exit", "quit"}:
             break
+
+        # Checkpointed sessions keep the conversation in the checkpoint, so only the new message is sent
+        if checkpointer is not None:
+            del conversation["messages"][1:]
         conversation["messages"].append(HumanMessage(content=user_input))
         print()
 
+        # Wait for a background startup to finish on the first message
+        if agent is None:
+            agent = startup.agent()
+            print(f"Agent ready:\n{startup.report()}\n")
+
         # Run agent with timing
-        start = time.perf_counter()         # start timing
-        output = agent.run(conversation)    # invoke/run agent
-        end = time.perf_counter()           # end timing
+        start = time.perf_counter()                                         # start timing
+        output = agent.run(conversation, args.latency_budget, thread_id)    # invoke/run agent
+        end = time.perf_counter()                                           # end timing
 
         # Print output and time taken
         print(f"\n[AI]:\n---\n{output}\n---\nTime was {end - start:.2f}s\n")
@@ -71,5 +108,27 @@ if __name__ == "__main__":
         # Append AI message to conversation
         conversation["messages"].append(AIMessage(content=output))
 
+    # Report how often local cascade models had to escalate to remote ones
+    for node, stats in cascade_stats().items():
+        saved = "unknown" if stats["latency_saved"] is None else f"{stats['latency_saved']:.2f}s"
+        print(f"::{node}: {stats['escalations']}/{stats['calls']} escalated "
+              f"({stats['escalation_rate']:.0%}), {stats['local_failures']} local failures, {saved} saved")
+
+    # Report what query planning saved
+    plan_stats = PLANNER_STATS.snapshot()
+    print(f"::Query planning: {plan_stats['queries_merged']} queries merged into shared searches, "
+          f"{plan_stats['queries_dropped']} duplicate queries dropped "
+          f"(up to {plan_stats['summaries_estimated']} summaries avoided), "
+          f"{plan_stats['summaries_skipped']} repeat summaries skipped")
+
+    # Report prompt sizes per node
+    for node, stats in PROMPT_STATS.snapshot().items():
+        print(f"::{node} tokens: {stats['input']['count']} prompts, input mean {stats['input']['mean']:.0f} "
+              f"(max {stats['input']['max']}), output mean {stats['output']['mean']:.0f} "
+              f"(max {stats['output']['max']})")
+
     # Close agent resources
-    agent.close()
+    if agent is not None:
+        agent.close()
+    if checkpointer is not None:
+        checkpointer.conn.close()
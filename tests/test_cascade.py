@@ -0,0 +1,65 @@
+import itertools
+
+import pytest
+
+pytest.importorskip("rapidfuzz")
+ChatOllama = pytest.importorskip("langchain_ollama").ChatOllama
+
+from ai.models.cascade import CascadeModel
+from ai.models.ollama_stub import OllamaStubServer
+
+
+class RemoteModel:
+    """Remote model stand-in that records whether the cascade escalated to it."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, messages, **kwargs):
+        self.calls += 1
+        return "remote"
+
+
+def cascade(server: OllamaStubServer, remote: RemoteModel) -> CascadeModel:
+    local = ChatOllama(model=server.model, base_url=server.url, temperature=0.7)
+    return CascadeModel("test", local, remote, samples=3, threshold=0.9)
+
+
+def test_consistent_local_answers_are_not_escalated():
+    # Answers that differ only in case/punctuation count as agreeing
+    replies = itertools.cycle(["Yes", "yes.", "Yes!"])
+    remote = RemoteModel()
+    with OllamaStubServer(lambda messages: next(replies)) as server:
+        result = cascade(server, remote).invoke([("human", "Is the research sufficient?")])
+
+        assert len(server.requests) == 3
+
+    assert remote.calls == 0
+    assert result.content.strip().lower().startswith("yes")
+
+
+def test_inconsistent_local_answers_are_escalated():
+    replies = itertools.cycle(["Yes", "No, it misses the second question entirely.", "Maybe"])
+    remote = RemoteModel()
+    with OllamaStubServer(lambda messages: next(replies)) as server:
+        model = cascade(server, remote)
+        result = model.invoke([("human", "Is the research sufficient?")])
+
+    assert result == "remote"
+    assert remote.calls == 1
+    assert model.stats.snapshot()["escalations"] == 1
+
+
+def test_local_failures_are_counted_apart_from_escalations():
+    class BrokenLocal:
+        def batch(self, inputs):
+            raise ConnectionError("ollama unreachable")
+
+    remote = RemoteModel()
+    model = CascadeModel("test", BrokenLocal(), remote)
+    result = model.invoke([("human", "Is the research sufficient?")])
+
+    stats = model.stats.snapshot()
+    assert result == "remote"
+    assert stats["local_failures"] == 1
+    assert stats["escalations"] == 0
@@ -0,0 +1,105 @@
+import itertools
+from concurrent.futures import Future
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from ai.subgraphs.research_agent.model_config import MODEL_CONFIG
+from ai.subgraphs.research_agent.nodes import plan_queries as planner
+from ai.subgraphs.research_agent.nodes.plan_queries import SIMILARITY_THRESHOLD, PlannerStats, plan_queries
+from ai.subgraphs.research_agent.research_agent import ResearchAgent
+from dbs.query import Filters, QueryAndFilters
+from loadtest.stubs import StubChatModel, StubPostgresFilters, StubQdrant
+
+
+def vector(similarity):
+    """Unit vector with the given cosine similarity to the first axis."""
+
+    return [similarity, (1 - similarity ** 2) ** 0.5, 0.0]
+
+
+class VectorEmbedder:
+    """Embeds each text as the vector it was given for it."""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def submit_batch(self, texts):
+        future = Future()
+        future.set_result([self.vectors[t] for t in texts])
+        return future
+
+
+def query(text, author=None):
+    return QueryAndFilters(query=text, filters=Filters(author=author) if author else None)
+
+
+def plan(queries, vectors, executed=None):
+    qdrant = StubQdrant(latency=0, embedder=VectorEmbedder(vectors))
+    return plan_queries({"queries": queries, "executed_queries": executed}, qdrant)
+
+
+def test_queries_at_the_threshold_are_dropped_and_below_it_kept(monkeypatch):
+    monkeypatch.setattr(planner, "PLANNER_STATS", PlannerStats())
+    vectors = {"a": vector(1.0), "same": vector(SIMILARITY_THRESHOLD + 1e-3), "near": vector(SIMILARITY_THRESHOLD - 1e-2)}
+    result = plan([query("a"), query("same"), query("near")], vectors)
+
+    assert [p.queries for p in result["search_plan"]] == [["a", "near"]]
+    assert len(result["executed_queries"]) == 2
+
+
+def test_repeats_of_earlier_iterations_are_dropped_only_with_the_same_filters(monkeypatch):
+    monkeypatch.setattr(planner, "PLANNER_STATS", PlannerStats())
+    vectors = {"a": vector(1.0)}
+    executed = plan([query("a")], vectors)["executed_queries"]
+    result = plan([query("a"), query("a", author="Plato")], vectors, executed)
+
+    assert [(p.author, p.queries) for p in result["search_plan"]] == [("Plato", ["a"])]
+
+
+def test_queries_sharing_filters_are_merged_into_one_search(monkeypatch):
+    monkeypatch.setattr(planner, "PLANNER_STATS", PlannerStats())
+    vectors = {"a": [1.0, 0.0, 0.0], "b": [0.0, 1.0, 0.0], "c": [0.0, 0.0, 1.0]}
+    result = plan([query("a"), query("b", author="Plato"), query("c")], vectors)
+
+    assert [(p.author, p.queries) for p in result["search_plan"]] == [(None, ["a", "c"]), ("Plato", ["b"])]
+    assert [len(p.vectors) for p in result["search_plan"]] == [2, 1]
+
+
+def test_stats_separate_merged_queries_from_dropped_ones(monkeypatch):
+    stats = PlannerStats()
+    monkeypatch.setattr(planner, "PLANNER_STATS", stats)
+    vectors = {"a": [1.0, 0.0, 0.0], "b": [0.0, 1.0, 0.0], "c": [0.0, 0.0, 1.0]}
+    plan([query("a"), query("a"), query("b"), query("c", author="Plato")], vectors)
+
+    snapshot = stats.snapshot()
+    assert snapshot["queries"] == 4
+    assert snapshot["searches"] == 2
+    assert snapshot["queries_merged"] == 1
+    assert snapshot["queries_dropped"] == 1
+    assert snapshot["summaries_estimated"] == StubQdrant.LIMIT
+
+
+def test_research_loop_ends_when_follow_ups_find_nothing_new(monkeypatch):
+    counter = itertools.count()
+
+    class FreshQueries(StubChatModel):
+        """Writes a distinct query every call, so nothing is dropped by planning."""
+
+        def with_structured_output(self, schema):
+            class Structured:
+                def invoke(self, messages, **kwargs):
+                    return schema.model_validate({"queries": [{"query": f"question {next(counter)}"}]})
+
+            return Structured()
+
+    for node in list(MODEL_CONFIG):
+        monkeypatch.setitem(MODEL_CONFIG, node, FreshQueries(lambda messages: "text", latency=0))
+    monkeypatch.setitem(MODEL_CONFIG, "assess_resources_classifier", StubChatModel(lambda messages: "No", latency=0))
+    monkeypatch.setattr(planner, "PLANNER_STATS", PlannerStats())
+
+    # Every search returns the same single point, so only the first iteration adds a resource
+    agent = ResearchAgent(qdrant=StubQdrant(latency=0, corpus_size=1), postgres_filters=StubPostgresFilters())
+    agent.build()
+    agent.run({"messages": [SystemMessage(content="system"), HumanMessage(content="question")]})
+
+    assert next(counter) == 2
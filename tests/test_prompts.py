@@ -0,0 +1,70 @@
+import pytest
+
+from ai import prompts
+from ai.prompts import DROP_ITEMS, HEAD, TAIL, TRUNCATED, PromptBuilder, PromptStats
+
+
+@pytest.fixture(autouse=True)
+def estimate_tokens(monkeypatch):
+    """Count tokens as fixed 4-character chunks, so sizes are exact and tiktoken is not needed."""
+
+    monkeypatch.setattr(prompts, "_encoding", prompts._EstimateEncoding())
+    monkeypatch.setattr(prompts, "PROMPT_STATS", PromptStats())
+
+
+def numbered(count):
+    """Text of `count` one-token chunks '0000', '0001', ..."""
+
+    return "".join(f"{i:04d}" for i in range(count))
+
+
+def test_prompt_within_the_cap_is_unchanged():
+    builder = PromptBuilder("node", 100).add("history", numbered(10)).add("question", "abcd")
+    assert builder.render("{history}|", "{question}") == (numbered(10) + "|", "abcd")
+    assert builder.input_tokens == 12
+    assert prompts.PROMPT_STATS.snapshot()["node"]["input"]["count"] == 1
+
+
+def test_lowest_priority_section_is_shrunk_first():
+    builder = PromptBuilder("node", 20).add("history", numbered(20), priority=0).add("question", "q" * 40, priority=1)
+    history, question = builder.render("{history}", "{question}")
+
+    assert question == "q" * 40
+    assert history.startswith(numbered(7)) and history.endswith(TRUNCATED)
+    assert builder.input_tokens <= 20
+
+
+def test_tail_policy_keeps_the_end_and_overrides_win():
+    (tail,) = PromptBuilder("node", 10).add("history", numbered(20), policy=TAIL).render("{history}")
+    (head,) = PromptBuilder("node", 10, policies={"history": HEAD}).add("history", numbered(20), policy=TAIL) \
+        .render("{history}")
+
+    assert tail == f"{TRUNCATED} " + numbered(20)[-28:]
+    assert head == numbered(7) + f" {TRUNCATED}"
+
+
+def test_items_are_dropped_lowest_priority_first_in_original_order():
+    items = ["a" * 20, "b" * 20, "c" * 20, "d" * 20]
+    builder = PromptBuilder("node", 10).add_items("resources", items, item_priorities=[1, 0, 1, 0], separator="")
+
+    assert builder.render("{resources}") == ("a" * 20 + "c" * 20,)
+
+
+def test_items_of_equal_priority_drop_later_ones_first():
+    items = ["a" * 20, "b" * 20, "c" * 20, "d" * 20]
+    builder = PromptBuilder("node", 10).add_items("resources", items, separator="")
+
+    assert builder.sections["resources"]["policy"] == DROP_ITEMS
+    assert builder.render("{resources}") == ("a" * 20 + "b" * 20,)
+
+
+def test_last_remaining_item_is_truncated_to_fit():
+    builder = PromptBuilder("node", 10).add_items("resources", [numbered(30), "b" * 20], separator="")
+    (resources,) = builder.render("{resources}")
+
+    assert resources == numbered(7) + f" {TRUNCATED}"
+
+
+def test_section_text_containing_a_placeholder_is_not_substituted():
+    builder = PromptBuilder("node", 100).add("history", "{question}").add("question", "why?")
+    assert builder.render("{history} / {question}") == ("{question} / why?",)
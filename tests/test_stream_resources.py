@@ -0,0 +1,120 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from ai.subgraphs.research_agent.model_config import MODEL_CONFIG
+from ai.subgraphs.research_agent.nodes.query_vector_db import query_vector_db, stream_resources
+from ai.subgraphs.research_agent.schemas.query_plan import PlannedSearch
+
+
+def point(point_id, delay=0.0):
+    """Search result whose summary takes `delay` seconds."""
+
+    return SimpleNamespace(id=point_id, score=0.5, payload={"text": f"{point_id}|{delay}", "author": "A", "source": "S"})
+
+
+class SleepyModel:
+    """Summarizer that sleeps for the delay encoded in the resource text and returns the point id."""
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, messages, **kwargs):
+        point_id, delay = messages[1].content.split('"""\n')[1].split("\n")[0].split("|")
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(float(delay))
+        with self._lock:
+            self.active -= 1
+        return AIMessage(content=f"summary of {point_id}")
+
+
+class ReversedQdrant:
+    """Returns each search's points, finishing the searches in reverse plan order."""
+
+    def __init__(self, results, error=None):
+        self.results = results
+        self.error = error
+
+    def stream_plan(self, plan):
+        for index in reversed(range(len(plan))):
+            if self.error and index == 0:
+                raise self.error
+            yield index, self.results[index]
+
+
+def search(queries=1):
+    return PlannedSearch(author=None, source=None, queries=["q"] * queries, vectors=[[0.0]] * queries)
+
+
+def test_records_are_emitted_in_plan_order_despite_out_of_order_completion():
+    results = [[point(1, 0.2), point(2, 0.0)], [point(3, 0.1), point(4, 0.0)], [point(5, 0.0), point(6, 0.3)]]
+    state = {"search_plan": [search(), search(), search()]}
+
+    records = list(stream_resources(state, ReversedQdrant(results), SleepyModel()))
+
+    assert [r.id for r in records] == [1, 2, 3, 4, 5, 6]
+    assert records[0].summary == "summary of 1"
+
+
+def test_later_searches_are_summarized_while_earlier_summaries_run():
+    results = [[point(i * 2, 0.5), point(i * 2 + 1, 0.5)] for i in range(3)]
+    model = SleepyModel()
+
+    start = time.perf_counter()
+    list(stream_resources({"search_plan": [search(), search(), search()]}, ReversedQdrant(results), model))
+
+    # Six 0.5s summaries on five workers take two rounds; summarizing search by search would take three
+    assert model.peak == 5
+    assert time.perf_counter() - start < 1.4
+
+
+def test_shared_point_takes_its_best_rank_and_is_emitted_once():
+    # Point 7 is the second hit of the first search but the best hit of the second one
+    results = [[point(1), point(7)], [point(7), point(8)]]
+    state = {"search_plan": [search(), search()]}
+
+    records = list(stream_resources(state, ReversedQdrant(results), SleepyModel()))
+
+    assert [r.id for r in records] == [1, 7, 8]
+    assert {r.id: r.rank for r in records} == {1: 0, 7: 0, 8: 1}
+
+
+def test_fused_search_ranks_are_per_query():
+    results = [[point(1), point(2), point(3), point(4)]]
+
+    records = list(stream_resources({"search_plan": [search(queries=2)]}, ReversedQdrant(results), SleepyModel()))
+
+    assert [r.rank for r in records] == [0, 0, 1, 1]
+
+
+def test_points_already_summarized_this_turn_are_skipped():
+    previous = SimpleNamespace(id=1)
+    state = {"search_plan": [search()], "resource_summaries": [previous]}
+
+    records = list(stream_resources(state, ReversedQdrant([[point(1), point(2)]]), SleepyModel()))
+
+    assert [r.id for r in records] == [2]
+
+
+def test_search_errors_propagate():
+    results = [[point(1)], [point(2)]]
+
+    with pytest.raises(ConnectionError):
+        list(stream_resources({"search_plan": [search(), search()]}, ReversedQdrant(results, ConnectionError()),
+                              SleepyModel()))
+
+
+def test_query_vector_db_runs_outside_a_graph(monkeypatch):
+    monkeypatch.setitem(MODEL_CONFIG, "query_vector_db", SleepyModel())
+
+    update = query_vector_db({"search_plan": [search()]}, ReversedQdrant([[point(1), point(2)]]))
+
+    assert [r.id for r in update["resource_summaries"]] == [1, 2]
+    assert update["search_plan"] == []